@@ -0,0 +1,205 @@
+# ----------------------------------------------------------------------
+# Name:        batch_carrots
+# Purpose:     Vectorized versions of the homework2 carrot functions
+#
+# Author(s):    Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Compute Sammy's carrot consumption for many positions at once.
+
+The functions in homework2 handle one Sammy position and one medal at
+a time.  The functions below take arrays of Sammy positions and medal
+positions (anything numpy.asarray turns into an array of shape (n, 2))
+and compute every Sammy-medal pair in one vectorized numpy call.
+They give the same results as the homework2 functions for any carrot
+cost dictionary, with the medals taken in the order given: when
+several medals tie, the first one wins, as with min and max.
+
+Usage:  batch_carrots.py [options]
+Checks the batch functions against the homework2 functions on random
+positions and compares their speed.
+
+Options:
+    -s (--sammys): the number of Sammy positions
+    -m (--medals): the number of medals
+    -g (--grid): the size of the grid the positions are drawn from
+    -r (--repeat): the number of timed runs
+    --seed: the seed of the random number generator
+
+Example:  batch_carrots.py -s 1000 -m 1000
+"""
+import argparse
+import random
+import time
+import numpy
+from homework2 import NORTH, SOUTH, EAST, WEST
+import homework2
+
+
+def positions_array(positions):
+    """
+    Convert positions into an array with one (x, y) row per position.
+    :param positions: sequence of (x, y) tuples or array of shape (n, 2)
+    :return: (numpy array) of shape (n, 2)
+    """
+    return numpy.asarray(list(positions) if isinstance(positions, set)
+                         else positions).reshape(-1, 2)
+
+
+def carrots_to_medals(sammys, medals, carrot_cost):
+    """
+    Compute the number of carrots that each Sammy consumes to reach each
+    medal.
+    :param sammys (array of shape (s, 2)) the positions of Sammy
+    :param medals (array of shape (m, 2)) the positions of the medals
+    :param carrot_cost (dictionary) representing the carrot consumption
+    per step for each direction
+    :return: (numpy array of shape (s, m)) element [i, j] is
+             carrots_to_medal(sammys[i], medals[j], carrot_cost)
+    """
+    sammys = positions_array(sammys)
+    medals = positions_array(medals)
+    # positive when Sammy is to the right of / below the medal
+    x_steps = numpy.subtract.outer(sammys[:, 0], medals[:, 0])
+    y_steps = numpy.subtract.outer(sammys[:, 1], medals[:, 1])
+    # carrots per step, negated when moving East or South
+    x_costs = numpy.where(x_steps >= 0, carrot_cost[WEST],
+                          -carrot_cost[EAST])
+    y_costs = numpy.where(y_steps >= 0, carrot_cost[NORTH],
+                          -carrot_cost[SOUTH])
+    return x_costs * x_steps + y_costs * y_steps
+
+
+def carrot_queries(sammys, medals, carrot_cost):
+    """
+    Compute the carrot matrix and, for each Sammy, the medal that costs
+    the fewest carrots and the medal that costs the most.
+    :param sammys (array of shape (s, 2)) the positions of Sammy
+    :param medals (array of shape (m, 2)) the positions of the medals,
+    at least one
+    :param carrot_cost (dictionary) representing the carrot consumption
+    per step for each direction
+    :return: (tuple) the (s, m) carrot matrix (see carrots_to_medals),
+             the index of the cheapest medal for each Sammy and the
+             index of the most expensive medal for each Sammy
+    """
+    costs = carrots_to_medals(sammys, medals, carrot_cost)
+    return costs, costs.argmin(axis=1), costs.argmax(axis=1)
+
+
+def min_carrots_batch(sammys, medals, carrot_cost):
+    """
+    Compute the minimum number of carrots that each Sammy consumes to
+    reach a medal.
+    :param sammys (array of shape (s, 2)) the positions of Sammy
+    :param medals (array of shape (m, 2)) the positions of the medals
+    :param carrot_cost (dictionary) representing the carrot consumption
+    per step for each direction
+    :return: (numpy array of shape (s,)) element i is
+             min_carrots(sammys[i], medals, carrot_cost), or None if
+             there are no medals
+    """
+    medals = positions_array(medals)
+    if not len(medals):
+        return None
+    return carrots_to_medals(sammys, medals, carrot_cost).min(axis=1)
+
+
+def most_carrots_medal_batch(sammys, medals, carrot_cost):
+    """
+    Find the medal that each Sammy consumes the most carrots to reach.
+    :param sammys (array of shape (s, 2)) the positions of Sammy
+    :param medals (array of shape (m, 2)) the positions of the medals
+    :param carrot_cost (dictionary) representing the carrot consumption
+    per step for each direction
+    :return: (numpy array of shape (s, 2)) row i is
+             most_carrots_medal(sammys[i], medals, carrot_cost), or
+             None if there are no medals
+    """
+    medals = positions_array(medals)
+    if not len(medals):
+        return None
+    costs = carrots_to_medals(sammys, medals, carrot_cost)
+    return medals[costs.argmax(axis=1)]
+
+
+def best_time(function, repeat):
+    """
+    Time a function call.
+    :param function (function) called without arguments
+    :param repeat (int) the number of timed calls
+    :return: (tuple) the result of the last call and the best time in
+             seconds
+    """
+    best = float('inf')
+    for each_run in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start_time)
+    return result, best
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the benchmark options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--sammys',
+                        help='number of Sammy positions',
+                        type=int,
+                        default=1000)
+    parser.add_argument('-m', '--medals',
+                        help='number of medals',
+                        type=int,
+                        default=1000)
+    parser.add_argument('-g', '--grid',
+                        help='size of the grid',
+                        type=int,
+                        default=1000)
+    parser.add_argument('-r', '--repeat',
+                        help='number of timed runs',
+                        type=int,
+                        default=3)
+    parser.add_argument('--seed',
+                        help='seed of the random number generator',
+                        type=int,
+                        default=0)
+    return parser.parse_args()
+
+
+def main():
+    # The main function checks and times the batch functions.
+    arguments = get_arguments()
+    generator = random.Random(arguments.seed)
+    grid = arguments.grid
+    sammys = [(generator.randrange(grid), generator.randrange(grid))
+              for each in range(arguments.sammys)]
+    medals = [(generator.randrange(grid), generator.randrange(grid))
+              for each in range(arguments.medals)]
+    carrot_cost = {WEST: 1, EAST: 2, SOUTH: 3, NORTH: 4}
+    print(f'{arguments.sammys:,} Sammys x {arguments.medals:,} medals')
+    print(f'{"function":<22}{"homework2":>12}{"batch":>12}{"speedup":>10}')
+    scalar_results = [
+        lambda: [[homework2.carrots_to_medal(sammy, medal, carrot_cost)
+                  for medal in medals] for sammy in sammys],
+        lambda: [homework2.min_carrots(sammy, medals, carrot_cost)
+                 for sammy in sammys],
+        lambda: [homework2.most_carrots_medal(sammy, medals, carrot_cost)
+                 for sammy in sammys]]
+    batch_results = [
+        lambda: carrots_to_medals(sammys, medals, carrot_cost),
+        lambda: min_carrots_batch(sammys, medals, carrot_cost),
+        lambda: most_carrots_medal_batch(sammys, medals, carrot_cost)]
+    names = ['carrots_to_medal', 'min_carrots', 'most_carrots_medal']
+    for name, scalar, batch in zip(names, scalar_results, batch_results):
+        expected, scalar_time = best_time(scalar, arguments.repeat)
+        result, batch_time = best_time(batch, arguments.repeat)
+        if numpy.asarray(expected).tolist() != result.tolist():
+            print(f'{name}: the batch results differ!')
+        print(f'{name:<22}{scalar_time:>11.4f}s{batch_time:>11.4f}s'
+              f'{scalar_time / batch_time:>9.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,7 @@ The maze_file is a text file such as SJSU.txt
 The search_algorithm in homework 3 is:
     dfs: for depth first search
     bfs: for breadth first search
+    bfs_early: for breadth first search with an early goal test
     ucs for uniform cost search
 Example:  spartanquest.py SJSU.txt dfs
 
@@ -246,8 +247,8 @@ def get_arguments():
                         help='name of the text file containing the maze info',
                         type=argparse.FileType('r')) # open the file
     parser.add_argument('search_algorithm',
-                        help='dfs, bfs or ucs?',
-                        choices=['dfs', 'bfs', 'ucs'])
+                        help='dfs, bfs, bfs_early or ucs?',
+                        choices=['dfs', 'bfs', 'bfs_early', 'ucs'])
     arguments = parser.parse_args()
 
     maze_file = arguments.maze_file
@@ -0,0 +1,673 @@
+# ----------------------------------------------------------------------
+# Name:     benchmark
+# Purpose:  Measure the performance of the spartanquest search code
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Benchmarks for the spartanquest search code
+
+Usage:  benchmark.py benchmark [maze_file ...] [options]
+The benchmark is:
+    expand: node expansion throughput of Problem.expand compared to
+            the original per-move bounds and wall checks
+    kernel: time of dfs, bfs, ucs, astar and weighted_astar on the
+            shared search kernel compared to their own loops from
+            before the kernel
+    nodes:  bytes per search tree node of the original Node objects,
+            Node objects with __slots__ and the NodeStore arrays, and
+            the peak memory of ucs with the original Node objects
+            compared to the NodeStore (measured with tracemalloc)
+    scaling: every algorithm with every heuristic on generated square
+            mazes of growing size (no maze files needed).  Each search
+            runs in its own process (see portfolio.py) and is dropped
+            from the larger mazes once it runs out of time or memory.
+            The memory is the peak allocated by the search, measured
+            with tracemalloc, whose overhead is part of the times.
+
+Options of the scaling benchmark:
+    -z (--sizes): the maze widths (and heights)
+    -d (--density): the probability that a position is a wall
+    -m (--medals): the number of medals
+    -s (--seed): the seed of the maze generator
+    -t (--timeout): the number of seconds allowed per search
+    -l (--memory-limit): the memory (MiB) a search may use (Unix only)
+
+Add the -k (--cache) option to cache the parsed mazes (in
+spartanquest.CACHE_DIR unless a directory is given), as with
+spartanquest.py.
+
+Example:  benchmark.py expand questH.txt questI.txt
+Example:  benchmark.py kernel questD.txt questF.txt questH.txt
+Example:  benchmark.py scaling -z 16 32 64 128 -t 10
+"""
+import argparse
+import collections
+import os
+import tempfile
+import time
+import tracemalloc
+import data_structures
+import informed_search
+import maze_generator
+import portfolio
+import spartanquest
+
+
+def load(maze_file, compact=False, cache_dir=None):
+    """
+    Read a quest.
+    :param
+    maze_file (string): the name of the maze file
+    compact (Boolean): True to use the compact state encoding
+    cache_dir (string): the directory of the parsed maze cache or None
+        to always parse the maze file
+    :return: (a Problem object) representing the quest
+    """
+    with open(maze_file) as file:
+        return spartanquest.Problem(file, compact, cache_dir)
+
+
+def legacy_expand(problem, state):
+    """
+    The original Problem.expand that checks the bounds and the walls
+    for every move.  Used as the baseline of the expand benchmark.
+    :param
+    problem (a Problem object) representing the quest
+    state - A state is represented by a tuple containing two tuples:
+            the current position (x, y) of Sammy the Spartan
+            a tuple containing the positions of the remaining medals
+    :return: list of (state, action, cost) tuples
+    """
+    result = []
+    position, current_medals = state
+    current_x, current_y = position
+    for action in problem.moves:
+        new_position = (current_x + problem.moves[action][0],
+                        current_y + problem.moves[action][1])
+        if problem.maze.within_bounds(new_position) and \
+            not problem.maze.is_wall(new_position):
+            new_medals = set(current_medals) - {new_position}
+            new_state = (new_position, tuple(new_medals))
+            result.append((new_state, action, problem.cost[action]))
+    return result
+
+
+def reachable_states(problem, limit):
+    """
+    Collect the states reachable from the start state in breadth first
+    order.
+    :param
+    problem (a Problem object) representing the quest
+    limit (int): the maximum number of states to collect
+    :return: list of states
+    """
+    start = problem.start_state()
+    seen = {start}
+    states = [start]
+    for state in states:
+        if len(states) >= limit:
+            break
+        for child_state, action, cost in problem.expand(state):
+            if child_state not in seen:
+                seen.add(child_state)
+                states.append(child_state)
+    return states[:limit]
+
+
+def time_expansions(expand, states, repeat):
+    """
+    Time the expansion of every given state.
+    :param
+    expand (function): the expand function to call on each state
+    states (list): the states to expand
+    repeat (int): the number of passes over the states
+    :return: (float) the best number of expansions per second
+    """
+    best = float('inf')
+    for each_pass in range(repeat):
+        start_time = time.perf_counter()
+        for state in states:
+            expand(state)
+        best = min(best, time.perf_counter() - start_time)
+    return len(states) / best
+
+
+def expand_benchmark(maze_files, limit=50000, repeat=5, cache_dir=None):
+    """
+    Compare the expansion throughput of the adjacency table with the
+    original bounds and wall checks.
+    :param
+    maze_files (list of strings): the names of the maze files
+    limit (int): the maximum number of states expanded per maze
+    repeat (int): the number of timed passes per maze
+    cache_dir (string): the directory of the parsed maze cache or None
+    :return: None
+    """
+    print(f'{"maze":<12}{"states":>10}{"legacy/s":>14}{"table/s":>14}'
+          f'{"compact/s":>14}{"table x":>9}{"compact x":>11}')
+    for maze_file in maze_files:
+        problem = load(maze_file, cache_dir=cache_dir)
+        compact_problem = load(maze_file, True, cache_dir)
+        states = reachable_states(problem, limit)
+        compact_states = [compact_problem.encode_state(*state)
+                          for state in states]
+        legacy = time_expansions(lambda state: legacy_expand(problem, state),
+                                 states, repeat)
+        table = time_expansions(problem.expand, states, repeat)
+        compact = time_expansions(compact_problem.expand, compact_states,
+                                  repeat)
+        print(f'{maze_file:<12}{len(states):>10,}{legacy:>14,.0f}'
+              f'{table:>14,.0f}{compact:>14,.0f}{table / legacy:>8.1f}x'
+              f'{compact / legacy:>10.1f}x')
+
+
+class LegacyNode(object):
+    """
+    The original search tree node, with a __dict__ holding its state,
+    parent, action and cumulative cost.  Used as the baseline of the
+    nodes benchmark.
+    """
+
+    def __init__(self, state, parent, action, cumulative_cost=0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cumulative_cost = cumulative_cost  # cost from root
+
+    def solution(self):
+        """
+        Returns the sequence of actions from the root to this node
+        :return: list of actions
+        """
+        node = self
+        path = []
+        while node.parent:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+
+def legacy_ucs(problem, stats):
+    """
+    Uniform cost search with LegacyNode objects.  Used as the baseline
+    of the nodes benchmark.
+    :param
+    problem (a Problem object) representing the quest
+    stats (a SearchStats object) collects statistics about the search
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.PriorityQueue()
+    stats.watch(fringe, closed)
+    root = LegacyNode(problem.start_state(), None, None)
+    fringe.push(root, root.cumulative_cost)
+    while not fringe.is_empty():
+        node = fringe.pop()
+        if problem.is_goal(node.state):
+            return node.solution()
+        if node.state not in closed:
+            closed.add(node.state)
+            for child_state, action, action_cost in problem.expand(node.state):
+                child_node = LegacyNode(child_state, node, action,
+                                        node.cumulative_cost + action_cost)
+                fringe.push(child_node, child_node.cumulative_cost)
+    return None
+
+
+def tree_bytes(make_tree, states):
+    """
+    Measure the memory of a search tree holding one node per given
+    state, each node the child of the previous one.
+    :param
+    make_tree (function): builds the tree from the list of states and
+        returns it
+    states (list): the states of the nodes
+    :return: (float) the number of bytes per node
+    """
+    tracemalloc.start()
+    tree = make_tree(states)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+    return size / len(states)
+
+
+def peak_memory(search, problem):
+    """
+    Measure the peak memory of a search.
+    :param
+    search (function): the search algorithm, taking the problem and a
+        SearchStats object
+    problem (a Problem object) representing the quest
+    :return: (tuple) the peak number of bytes and the number of nodes
+        generated
+    """
+    stats = data_structures.SearchStats()
+    tracemalloc.start()
+    search(problem, stats)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, stats.report()['pushes']
+
+
+def node_chain(node_class):
+    """
+    Return a function that builds a chain of node_class objects.
+    :param node_class: (class) LegacyNode or data_structures.Node
+    :return: (function) maps a list of states to the last node
+    """
+    def make_tree(states):
+        node = None
+        for cost, state in enumerate(states):
+            node = node_class(state, node, 'E', cost)
+        return node
+    return make_tree
+
+
+def store_chain(states):
+    """
+    Build a chain of nodes in a NodeStore.
+    :param states: (list) the states of the nodes
+    :return: (NodeStore) the store holding the nodes
+    """
+    nodes = data_structures.NodeStore()
+    node = None
+    for cost, state in enumerate(states):
+        node = nodes.add(state, node, 'E', cost)
+    return nodes
+
+
+def nodes_benchmark(maze_files, limit=200000, cache_dir=None):
+    """
+    Compare the memory of the original Node objects, Node objects with
+    __slots__ and the NodeStore arrays, per node and during ucs.
+    The states are created beforehand, so only the nodes are measured.
+    :param
+    maze_files (list of strings): the names of the maze files
+    limit (int): the maximum number of nodes per maze
+    cache_dir (string): the directory of the parsed maze cache or None
+    :return: None
+    """
+    print(f'{"maze":<12}{"nodes":>9}{"legacy B":>10}{"slots B":>9}'
+          f'{"store B":>9}{"store x":>9}{"ucs nodes":>11}{"legacy KiB":>12}'
+          f'{"store KiB":>11}{"store x":>9}')
+    for maze_file in maze_files:
+        problem = load(maze_file, cache_dir=cache_dir)
+        states = reachable_states(problem, limit)
+        legacy = tree_bytes(node_chain(LegacyNode), states)
+        slots = tree_bytes(node_chain(data_structures.Node), states)
+        store = tree_bytes(store_chain, states)
+        # each search gets a fresh problem, so neither pays for the
+        # lazy maze tables built by the other
+        legacy_peak, generated = peak_memory(
+            legacy_ucs, load(maze_file, cache_dir=cache_dir))
+        store_peak = peak_memory(spartanquest.uninformed_search.ucs,
+                                 load(maze_file, cache_dir=cache_dir))[0]
+        print(f'{maze_file:<12}{len(states):>9,}{legacy:>10.1f}{slots:>9.1f}'
+              f'{store:>9.1f}{legacy / store:>8.1f}x{generated:>11,}'
+              f'{legacy_peak / 1024:>12,.0f}{store_peak / 1024:>11,.0f}'
+              f'{legacy_peak / store_peak:>8.1f}x')
+
+
+def loop_dfs(problem):
+    """
+    Depth first search with its own loop, as before the search kernel.
+    Used as the baseline of the kernel benchmark.
+    :param problem (a Problem object) representing the quest
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.Stack()
+    nodes = data_structures.NodeStore()
+    fringe.push(nodes.add(problem.start_state(), None, None))
+    while not fringe.is_empty():
+        node = fringe.pop()
+        state = nodes.pop_state(node)
+        if problem.is_goal(state):
+            return nodes.solution(node)
+        if state not in closed:
+            closed.add(state)
+            for child_state, action, action_cost in problem.expand(state):
+                fringe.push(nodes.add(child_state, node, action))
+    return None
+
+
+def loop_bfs(problem):
+    """
+    Breadth first search with its own loop, as before the search
+    kernel.  Used as the baseline of the kernel benchmark.
+    :param problem (a Problem object) representing the quest
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.Queue()
+    nodes = data_structures.NodeStore()
+    fringe.push(nodes.add(problem.start_state(), None, None))
+    while not fringe.is_empty():
+        node = fringe.pop()
+        state = nodes.pop_state(node)
+        if problem.is_goal(state):
+            return nodes.solution(node)
+        if state not in closed:
+            closed.add(state)
+            for child_state, action, action_cost in problem.expand(state):
+                fringe.push(nodes.add(child_state, node, action))
+    return None
+
+
+def loop_ucs(problem):
+    """
+    Uniform cost search with its own loop, as before the search kernel.
+    Used as the baseline of the kernel benchmark.
+    :param problem (a Problem object) representing the quest
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.PriorityQueue()
+    nodes = data_structures.NodeStore()
+    fringe.push(nodes.add(problem.start_state(), None, None), 0)
+    while not fringe.is_empty():
+        node = fringe.pop()
+        state = nodes.pop_state(node)
+        if problem.is_goal(state):
+            return nodes.solution(node)
+        if state not in closed:
+            closed.add(state)
+            for child_state, action, action_cost in problem.expand(state):
+                cost = nodes.cumulative_cost(node) + action_cost
+                fringe.push(nodes.add(child_state, node, action, cost), cost)
+    return None
+
+
+def loop_astar(problem, heuristic, cache_size=1 << 20):
+    """
+    A* search with its own loop and heuristic cache, as before the
+    search kernel.  Used as the baseline of the kernel benchmark.
+    :param
+    problem (a Problem object) representing the quest
+    heuristic (a function) the heuristic function to be used
+    cache_size (int) the maximum number of heuristic values to keep
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.PriorityQueue()
+    estimates = collections.OrderedDict()
+    nodes = data_structures.NodeStore()
+    fringe.push(nodes.add(problem.start_state(), None, None), 0)
+    while not fringe.is_empty():
+        node = fringe.pop()
+        state = nodes.pop_state(node)
+        if problem.is_goal(state):
+            return nodes.solution(node)
+        if state not in closed:
+            closed.add(state)
+            for child_state, action, action_cost in problem.expand(state):
+                cost = nodes.cumulative_cost(node) + action_cost
+                child_node = nodes.add(child_state, node, action, cost)
+                estimate = estimates.get(child_state)
+                if estimate is None:
+                    estimate = heuristic(child_state, problem)
+                    if len(estimates) >= cache_size:
+                        estimates.popitem(last=False)
+                    estimates[child_state] = estimate
+                fringe.push(child_node, cost + estimate)
+    return None
+
+
+def loop_weighted_astar(problem, heuristic, weight=2.0):
+    """
+    Weighted A* search with its own loop, as before the search kernel.
+    Used as the baseline of the kernel benchmark.
+    :param
+    problem (a Problem object) representing the quest
+    heuristic (a function) the heuristic function to be used
+    weight (number >= 1) the weight of the heuristic
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()
+    fringe = data_structures.PriorityQueue()
+    nodes = data_structures.NodeStore()
+    fringe.push(nodes.add(problem.start_state(), None, None), 0)
+    while not fringe.is_empty():
+        node = fringe.pop()
+        state = nodes.pop_state(node)
+        if problem.is_goal(state):
+            return nodes.solution(node)
+        if state not in closed:
+            closed.add(state)
+            for child_state, action, action_cost in problem.expand(state):
+                cost = nodes.cumulative_cost(node) + action_cost
+                fringe.push(nodes.add(child_state, node, action, cost),
+                            cost + weight * heuristic(child_state, problem))
+    return None
+
+
+def kernel_searches(heuristic):
+    """
+    Return the searches compared by the kernel benchmark.
+    :param heuristic: (function) the heuristic of astar and weighted_astar
+    :return: list of (name, loop search, kernel search) tuples, each
+        search taking the problem
+    """
+    uninformed = spartanquest.uninformed_search
+    return [('dfs', loop_dfs, uninformed.dfs),
+            ('bfs', loop_bfs, uninformed.bfs),
+            ('ucs', loop_ucs, uninformed.ucs),
+            ('astar', lambda problem: loop_astar(problem, heuristic),
+             lambda problem: informed_search.astar(problem, heuristic)),
+            ('weighted_astar',
+             lambda problem: loop_weighted_astar(problem, heuristic),
+             lambda problem: informed_search.weighted_astar(problem,
+                                                            heuristic))]
+
+
+def time_search(search, maze_file, repeat, cache_dir=None):
+    """
+    Time a search on a fresh problem for each run.
+    :param
+    search (function): the search algorithm, taking the problem
+    maze_file (string): the name of the maze file
+    repeat (int): the number of timed runs
+    cache_dir (string): the directory of the parsed maze cache or None
+    :return: (tuple) the best number of seconds, the solution and the
+        number of nodes expanded
+    """
+    best = float('inf')
+    for each_run in range(repeat):
+        problem = load(maze_file, cache_dir=cache_dir)
+        start_time = time.perf_counter()
+        solution = search(problem)
+        best = min(best, time.perf_counter() - start_time)
+    return best, solution, problem.nodes_expanded()
+
+
+def kernel_benchmark(maze_files, repeat=3, cache_dir=None):
+    """
+    Compare the time of dfs, bfs, ucs, astar and weighted_astar on the
+    shared search kernel with their own loops from before the kernel.
+    astar and weighted_astar use gen_heuristic.
+    :param
+    maze_files (list of strings): the names of the maze files
+    repeat (int): the number of timed runs of each search (the best
+        one is reported)
+    cache_dir (string): the directory of the parsed maze cache or None
+    :return: None
+    """
+    print(f'{"maze":<12}{"search":<16}{"expanded":>10}{"loop sec":>10}'
+          f'{"kernel sec":>12}{"kernel x":>10}')
+    for maze_file in maze_files:
+        for name, loop, kernel in \
+                kernel_searches(informed_search.gen_heuristic):
+            loop_time, expected, loop_nodes = time_search(
+                loop, maze_file, repeat, cache_dir)
+            kernel_time, solution, nodes = time_search(
+                kernel, maze_file, repeat, cache_dir)
+            if solution != expected or nodes != loop_nodes:
+                print(f'{maze_file:<12}{name:<16}different results!')
+            print(f'{maze_file:<12}{name:<16}{nodes:>10,}{loop_time:>10.4f}'
+                  f'{kernel_time:>12.4f}{loop_time / kernel_time:>9.2f}x')
+
+
+def all_searches():
+    """
+    Return every search algorithm, the informed ones with every
+    heuristic defined in informed_search.
+    :return: list of (algorithm, heuristic) tuples
+    """
+    heuristics = sorted(name for name in dir(informed_search)
+                        if name.endswith('_heuristic'))
+    return [(algorithm, None) for algorithm in spartanquest.UNINFORMED] + \
+           [(algorithm, heuristic) for algorithm in spartanquest.INFORMED
+            if algorithm != 'medal_tour' for heuristic in heuristics] + \
+           [('medal_tour', None)]  # medal_tour ignores the heuristic
+
+
+def growth(previous, result, field):
+    """
+    Format the growth of a field from one result to the next.
+    :param
+    previous (dictionary): the result on the smaller maze or None
+    result (dictionary): the result on the larger maze
+    field (string): the name of the field
+    :return: (string) the ratio of the values or '' if there is none
+    """
+    if previous is None or not previous[field]:
+        return ''
+    return f'{result[field] / previous[field]:.1f}x'
+
+
+def scaling_benchmark(sizes, density=0.3, medals=3, seed=0, timeout=10,
+                      memory_limit=None, cache_dir=None):
+    """
+    Run every search on generated mazes of growing size and report how
+    the nodes expanded, the time and the memory grow.  A search that
+    times out or runs out of memory on a maze is not run on the larger
+    ones.
+    :param
+    sizes (list of ints): the widths (and heights) of the mazes
+    density (float): the probability that a position is a wall
+    medals (int): the number of medals in each maze
+    seed (int): the seed of the maze generator
+    timeout (float): the number of seconds allowed per search
+    memory_limit (int): the number of MiB allowed per search - defaults
+        to no limit
+    cache_dir (string): the directory of the parsed maze cache or None
+    :return: None
+    """
+    searches = all_searches()
+    runs = {search: [] for search in searches}  # the results per search
+    limits = {}  # maps a search to the size it stopped at
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            maze_file = os.path.join(directory, f'maze{size}.txt')
+            with open(maze_file, 'w') as file:
+                maze_generator.write_maze(maze_generator.generate_maze(
+                    size, size, density, medals, seed), file)
+            running = [search for search in searches
+                       if search not in limits]
+            results = portfolio.run_portfolio([maze_file], running,
+                                              timeout=timeout,
+                                              memory_limit=memory_limit,
+                                              cache_dir=cache_dir,
+                                              trace_memory=True)
+            for search, result in zip(running, results):
+                if result['status'] not in ('solved', 'failed'):
+                    limits[search] = (size, result['status'])
+                else:
+                    result['size'] = size
+                    runs[search].append(result)
+    print(f'{"search":<34}{"size":>6}{"expanded":>12}{"growth":>8}'
+          f'{"time":>10}{"growth":>8}{"MiB":>9}{"growth":>8}')
+    for search in searches:
+        name = search[0] + (':' + search[1] if search[1] else '')
+        previous = None
+        for result in runs[search]:
+            nodes_growth = growth(previous, result, 'nodes_expanded')
+            time_growth = growth(previous, result, 'wall_time')
+            memory_growth = growth(previous, result, 'search_memory')
+            print(f'{name:<34}{result["size"]:>6}'
+                  f'{result["nodes_expanded"]:>12,}{nodes_growth:>8}'
+                  f'{result["wall_time"]:>10.4f}{time_growth:>8}'
+                  f'{result["search_memory"] / 1024:>9.2f}{memory_growth:>8}')
+            previous = result
+        if search in limits:
+            size, status = limits[search]
+            print(f'{name:<34}{size:>6}  stopped: {status}')
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the benchmark specified, the maze
+            files specified and the options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('benchmark',
+                        help='expand, kernel, nodes or scaling?',
+                        choices=['expand', 'kernel', 'nodes', 'scaling'])
+    parser.add_argument('maze_files',
+                        help='names of the text files containing the mazes',
+                        nargs='*')
+    parser.add_argument('-z', '--sizes',
+                        help='widths of the generated mazes',
+                        nargs='+',
+                        type=int,
+                        default=[8, 16, 32, 64, 128])
+    parser.add_argument('-d', '--density',
+                        help='probability that a position is a wall',
+                        type=float,
+                        default=0.3)
+    parser.add_argument('-m', '--medals',
+                        help='number of medals in each generated maze',
+                        type=int,
+                        default=3)
+    parser.add_argument('-s', '--seed',
+                        help='seed of the maze generator',
+                        type=int,
+                        default=0)
+    parser.add_argument('-t', '--timeout',
+                        help='seconds allowed per search',
+                        type=float,
+                        default=10)
+    parser.add_argument('-l', '--memory-limit',
+                        help='MiB of memory allowed per search',
+                        type=int,
+                        default=None)
+    parser.add_argument('-k', '--cache',
+                        help='cache the parsed mazes in DIR (defaults to '
+                             + spartanquest.CACHE_DIR + ')',
+                        metavar='DIR',
+                        nargs='?',
+                        const=spartanquest.CACHE_DIR,
+                        default=None)
+    arguments = parser.parse_args()
+    if arguments.benchmark != 'scaling' and not arguments.maze_files:
+        parser.error(f'the {arguments.benchmark} benchmark needs maze files')
+    return arguments
+
+
+def main():
+    arguments = get_arguments()
+    if arguments.benchmark == 'expand':
+        expand_benchmark(arguments.maze_files, cache_dir=arguments.cache)
+    elif arguments.benchmark == 'kernel':
+        kernel_benchmark(arguments.maze_files, cache_dir=arguments.cache)
+    elif arguments.benchmark == 'nodes':
+        nodes_benchmark(arguments.maze_files, cache_dir=arguments.cache)
+    elif arguments.benchmark == 'scaling':
+        scaling_benchmark(arguments.sizes, arguments.density,
+                          arguments.medals, arguments.seed,
+                          arguments.timeout, arguments.memory_limit,
+                          arguments.cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,10 @@
 """
 Class definitions for data structures used by the search algorithms
 """
+import array  # for the node store implementation
+import collections  # for the queue implementation
 import heapq  # for the priority queue implementation
+import time  # for the search statistics
 
 
 class Node(object):
@@ -21,6 +24,7 @@ class Node(object):
     cumulative_cost: the cumulative total cost from the root to the
         current state
     """
+    __slots__ = ('state', 'parent', 'action', 'cumulative_cost')
 
     def __init__(self, state, parent, action, cumulative_cost=0):
         self.state = state
@@ -50,6 +54,116 @@ class Node(object):
         return path
 
 
+class NodeStore(object):
+    """
+    Represent a search tree compactly: each node is an int id and its
+    parent, action and cumulative cost are kept in parallel arrays
+    indexed by that id, instead of one Node object per node.
+    A node needs about 21 bytes this way, under a quarter of the size
+    of a Node with a __dict__.
+    Attributes:
+    states: list of the state of each node (None once popped)
+    parents: array of the parent id of each node (-1 for the root)
+    action_codes: array of the action code of each node
+    costs: array of the cumulative cost of each node (ints until the
+        first cost that is not an int, then floats)
+    actions: list of the distinct actions, indexed by action code
+    codes: dictionary mapping each distinct action to its code
+    """
+
+    def __init__(self):
+        self.states = []
+        self.parents = array.array('i')
+        self.action_codes = array.array('B')  # widened past 256 actions
+        self.costs = array.array('q')  # widened by the first float cost
+        self.actions = [None]  # code 0 is the root's action
+        self.codes = {None: 0}
+
+    def add(self, state, parent, action, cumulative_cost=0):
+        """
+        Add a node to the search tree.
+        :param
+        state: problem state corresponding to the node
+        parent: (int) id of the parent node or None if root node
+        action: the action that got us to the state or None if root
+        cumulative_cost: (number) the cumulative total cost from the
+            root to the state - defaults to 0
+        :return: (int) the id of the new node
+        """
+        try:
+            self.costs.append(cumulative_cost)
+        except TypeError:  # not an int
+            self.widen_costs()
+            self.costs.append(cumulative_cost)
+        code = self.codes.get(action)
+        if code is None:
+            code = self.codes[action] = len(self.actions)
+            self.actions.append(action)
+            if code == 256:
+                self.action_codes = array.array('I', self.action_codes)
+        self.states.append(state)
+        self.parents.append(-1 if parent is None else parent)
+        self.action_codes.append(code)
+        return len(self.states) - 1
+
+    def widen_costs(self):
+        """
+        Switch the costs array from ints to floats, keeping the costs
+        already added.  Called when the first cost that is not an int
+        is added.
+        :return: None
+        """
+        self.costs = array.array('d', self.costs)
+
+    def state(self, node):
+        """
+        Return the state of the given node.
+        :param node: (int) the id of the node
+        :return: the problem state
+        """
+        return self.states[node]
+
+    def pop_state(self, node):
+        """
+        Return the state of the given node and drop the reference the
+        store holds to it.  A search calls this when it pops the node
+        from its fringe, so the store only keeps the states of the
+        nodes still on the fringe, like the Node objects did.
+        :param node: (int) the id of the node
+        :return: the problem state
+        """
+        state = self.states[node]
+        self.states[node] = None
+        return state
+
+    def cumulative_cost(self, node):
+        """
+        Return the cumulative cost of the given node.
+        :param node: (int) the id of the node
+        :return: (number) the cost from the root to the node
+        """
+        return self.costs[node]
+
+    def solution(self, node):
+        """
+        Returns the sequence of actions from the root to the given node
+        :param node: (int) the id of the node
+        :return: list of actions
+        """
+        actions = self.actions
+        parents = self.parents
+        codes = self.action_codes
+        path = []
+        while parents[node] >= 0:
+            path.append(actions[codes[node]])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self):
+        return len(self.states)
+
+
 class Stack(object):
     """
     Represent a stack with LIFO (last in first out) queuing
@@ -57,6 +171,8 @@ class Stack(object):
 
     def __init__(self):
         self.list = []
+        self.count = 0  # the number of items pushed so far
+        self.peak_size = 0  # the largest number of items held at once
 
     def push(self, item):
         """
@@ -65,6 +181,9 @@ class Stack(object):
         :return: None
         """
         self.list.append(item)
+        self.count += 1
+        if len(self.list) > self.peak_size:
+            self.peak_size = len(self.list)
 
     def pop(self):
         """
@@ -80,14 +199,20 @@ class Stack(object):
         """
         return not self.list
 
+    def __len__(self):
+        return len(self.list)
+
 
 class Queue:
     """
     Represent a queue with FIFO (first in first out) queuing
+    The items are kept in a deque so both push and pop are O(1).
     """
 
     def __init__(self):
-        self.list = []
+        self.deque = collections.deque()
+        self.count = 0  # the number of items pushed so far
+        self.peak_size = 0  # the largest number of items held at once
 
     def push(self, item):
         """
@@ -95,21 +220,27 @@ class Queue:
         :param item: (of any type)
         :return: None
         """
-        self.list.insert(0, item)
+        self.deque.append(item)
+        self.count += 1
+        if len(self.deque) > self.peak_size:
+            self.peak_size = len(self.deque)
 
     def pop(self):
         """
         Remove the earliest pushed item from the queue and return it.
         :return: item (of any type)
         """
-        return self.list.pop()
+        return self.deque.popleft()
 
     def is_empty(self):
         """
         Is this queue empty?
         :return: (Boolean) True if the queue is empty, False otherwise
         """
-        return not self.list
+        return not self.deque
+
+    def __len__(self):
+        return len(self.deque)
 
 
 class PriorityQueue(object):
@@ -121,6 +252,7 @@ class PriorityQueue(object):
     def __init__(self):
         self.heap = []
         self.count = 0
+        self.peak_size = 0  # the largest number of items held at once
 
     def push(self, item, priority):
         """
@@ -133,6 +265,8 @@ class PriorityQueue(object):
         entry = (priority, self.count, item)
         heapq.heappush(self.heap, entry)
         self.count += 1
+        if len(self.heap) > self.peak_size:
+            self.peak_size = len(self.heap)
 
     def pop(self):
         """
@@ -148,3 +282,274 @@ class PriorityQueue(object):
         :return: (Boolean) True if the queue is empty, False otherwise
         """
         return not self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class IndexedPriorityQueue(object):
+    """
+    Represent a priority queue that holds at most one entry per key.
+    The key is typically the search state and the item its Node.
+    Pushing a key that is already queued keeps only the entry with the
+    lower priority (decrease-key), so the queue never holds stale
+    entries for the search to skip after popping them.
+
+    Attributes:
+    heap: list of [priority, count, key, item] entries
+    index: dictionary mapping each queued key to its position in heap
+    count: number of entries pushed so far, used to break ties
+    decreased: number of pushes that lowered the priority of a key
+        that was already queued
+    rejected: number of pushes ignored because the key was already
+        queued with a lower or equal priority
+    peak_size: the largest number of items held at once
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.index = {}
+        self.count = 0
+        self.decreased = 0
+        self.rejected = 0
+        self.peak_size = 0
+
+    def push(self, key, item, priority):
+        """
+        Add the given item with the given priority under the given key.
+        If the key is already queued, only the entry with the lower
+        priority is kept.
+        :param
+        key: (any hashable type) identifies the entry
+        item: (of any type)
+        priority: (number or other orderable type)
+        :return: (Boolean) True if the item was queued, False if it was
+            rejected
+        """
+        position = self.index.get(key)
+        if position is None:
+            entry = [priority, self.count, key, item]
+            self.heap.append(entry)
+            self.index[key] = len(self.heap) - 1
+            self._sift_up(len(self.heap) - 1)
+            if len(self.heap) > self.peak_size:
+                self.peak_size = len(self.heap)
+        elif priority < self.heap[position][0]:
+            self.heap[position][0:2] = [priority, self.count]
+            self.heap[position][3] = item
+            self._sift_up(position)
+            self.decreased += 1
+        else:
+            self.rejected += 1
+            return False
+        self.count += 1
+        return True
+
+    def pop(self):
+        """
+        Remove the item with the lowest priority from the queue and return it.
+        :return: item (of any type)
+        """
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry = heap[0]
+            heap[0] = last
+            self.index[last[2]] = 0
+            self._sift_down(0)
+        else:
+            entry = last
+        del self.index[entry[2]]
+        return entry[3]
+
+    def get(self, key):
+        """
+        Return the item queued under the given key.
+        :param key: (any hashable type)
+        :return: item (of any type) or None if the key is not queued
+        """
+        position = self.index.get(key)
+        if position is None:
+            return None
+        return self.heap[position][3]
+
+    def is_empty(self):
+        """
+        Is this priority queue empty?
+        :return: (Boolean) True if the queue is empty, False otherwise
+        """
+        return not self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def _sift_up(self, position):
+        """
+        Move the entry at the given position up to its place in the heap.
+        This is a private method.
+        :param position: (int) position of the entry in the heap
+        :return: None
+        """
+        heap = self.heap
+        index = self.index
+        entry = heap[position]
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if entry < parent:
+                heap[position] = parent
+                index[parent[2]] = position
+                position = parent_position
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+    def _sift_down(self, position):
+        """
+        Move the entry at the given position down to its place in the heap.
+        This is a private method.
+        :param position: (int) position of the entry in the heap
+        :return: None
+        """
+        heap = self.heap
+        index = self.index
+        size = len(heap)
+        entry = heap[position]
+        child_position = 2 * position + 1
+        while child_position < size:
+            right_position = child_position + 1
+            if right_position < size and \
+                    heap[right_position] < heap[child_position]:
+                child_position = right_position
+            child = heap[child_position]
+            if child < entry:
+                heap[position] = child
+                index[child[2]] = position
+                position = child_position
+                child_position = 2 * position + 1
+            else:
+                break
+        heap[position] = entry
+        index[entry[2]] = position
+
+
+class SearchStats(object):
+    """
+    Collect statistics about a search without changing its result.
+    A search algorithm that accepts a stats argument passes its fringe
+    and its set of explored states to watch, counts the popped nodes it
+    skips as duplicates, calls its expand and heuristic functions
+    through the wrappers returned by timed_expand and timed_heuristic
+    and calls finish when it ends.
+    Arguments:
+    sample_every: record the state expanded every sample_every
+        expansions - defaults to 0 (no samples)
+    Attributes:
+    duplicates: number of popped nodes skipped because their state
+        was already explored
+    expansions: number of states expanded
+    heuristic_calls: number of heuristic evaluations
+    expand_time: seconds spent expanding states
+    heuristic_time: seconds spent evaluating the heuristic
+    samples: list of (expansions, seconds, state, fringe size) tuples
+    start_time, end_time: time.perf_counter() values at the start and
+        the end of the search (end_time is None until the search calls
+        finish, and the search time is then measured up to now)
+    """
+
+    def __init__(self, sample_every=0):
+        self.duplicates = 0
+        self.expansions = 0
+        self.heuristic_calls = 0
+        self.expand_time = 0.0
+        self.heuristic_time = 0.0
+        self.sample_every = sample_every
+        self.samples = []
+        self.fringe = Stack()
+        self.closed = set()
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def watch(self, fringe, closed):
+        """
+        Follow the fringe and the explored states of a search that is
+        about to start.  The explored states must only grow.
+        :param
+        fringe: (Stack, Queue or PriorityQueue) the search fringe
+        closed: (set) the explored states
+        :return: None
+        """
+        self.fringe = fringe
+        self.closed = closed
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def finish(self):
+        """
+        Record the end of the search, so the search time does not grow
+        with whatever runs before the statistics are reported.
+        :return: None
+        """
+        self.end_time = time.perf_counter()
+
+    def timed_expand(self, expand):
+        """
+        Wrap the given expand function so each call is counted, timed
+        and sampled.
+        :param expand: (function) maps a state to its successors
+        :return: (function) the wrapped expand function
+        """
+        def expand_and_record(state):
+            start = time.perf_counter()
+            successors = expand(state)
+            end = time.perf_counter()
+            self.expand_time += end - start
+            self.expansions += 1
+            if self.sample_every and \
+                    self.expansions % self.sample_every == 0:
+                self.samples.append((self.expansions,
+                                     end - self.start_time, state,
+                                     len(self.fringe)))
+            return successors
+        return expand_and_record
+
+    def timed_heuristic(self, heuristic):
+        """
+        Wrap the given heuristic function so each call is counted and
+        timed.
+        :param heuristic: (function) maps a state and problem to an
+            estimate
+        :return: (function) the wrapped heuristic function
+        """
+        def estimate_and_record(state, problem):
+            start = time.perf_counter()
+            estimate = heuristic(state, problem)
+            self.heuristic_time += time.perf_counter() - start
+            self.heuristic_calls += 1
+            return estimate
+        return estimate_and_record
+
+    def report(self):
+        """
+        Return the statistics collected so far.
+        :return: dictionary mapping each statistic name to its value
+        """
+        return {'pushes': self.fringe.count,
+                'pops': self.fringe.count - len(self.fringe),
+                'duplicates': self.duplicates,
+                'expansions': self.expansions,
+                'heuristic_calls': self.heuristic_calls,
+                'fringe_peak': self.fringe.peak_size,
+                'closed_peak': len(self.closed),
+                'expand_time': self.expand_time,
+                'heuristic_time': self.heuristic_time,
+                'search_time': (time.perf_counter() if self.end_time is None
+                                else self.end_time) - self.start_time,
+                'samples': [{'expansions': expansions, 'time': seconds,
+                             'state': state, 'fringe': fringe_size}
+                            for expansions, seconds, state, fringe_size
+                            in self.samples]}
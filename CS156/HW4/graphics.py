@@ -21,6 +21,11 @@ class Display(object):
     problem (a Problem object) representing the quest
             see Problem class definition in spartanquest.py)
     solution:  list of actions representing the solution to the quest
+    events: generator of the search still to run (see
+            search_kernel.best_first_events) - defaults to None.
+            The display runs the search, shading each position as it
+            is expanded, and then moves Sammy along the solution the
+            search returns instead of the given one.
 
     Attributes:
     problem (a Problem object) representing the quest
@@ -30,14 +35,20 @@ class Display(object):
     canvas:  tkinter widget used to visualize the solution
     medal_icon: set of Canvas ovals representing the remaining medals
     mascot: Canvas image representing Sammy the Spartan
+    solution: the solution shown (the one returned by the search if
+    events were given)
 
     """
     time_interval = 100  # decrease time_interval for faster animation
     size = 40  # size in pixel for each grid position
+    expansions_per_frame = 20  # expansions shown at each time interval
 
-    def __init__(self, problem, solution):
+    def __init__(self, problem, solution, events=None):
         self.medal_icon = {}
         self.problem = problem # save the problem info
+        self.solution = solution
+        self.events = events
+        self.explored = set()
         root = tkinter.Tk()
         root.title('Go Spartans!')
         self.canvas = tkinter.Canvas(root,
@@ -74,11 +85,47 @@ class Display(object):
                                         fill="gold",
                                         outline="")
 
-        if solution is not None:
+        if events is not None:
+            self.canvas.after(self.time_interval, self.explore)
+        elif solution is not None:
             self.actions = iter(solution)
             self.canvas.after(self.time_interval, self.move)
 #            self.animate()
         root.mainloop()
+        if self.events is not None:
+            self.events.close()  # the window was closed during the search
+
+    def explore(self):
+        """
+        Run the search for a few expansions and shade the positions
+        expanded.  Schedule the next expansions, or the moves along the
+        solution once the search is over.
+        :return: None
+        """
+        try:
+            for each_expansion in range(self.expansions_per_frame):
+                event = next(self.events)
+                position = self.problem.decode_state(event.state)[0]
+                if position not in self.explored:
+                    self.explored.add(position)
+                    x, y = position
+                    self.canvas.create_rectangle(x * self.size,
+                                                 y * self.size,
+                                                 (x + 1) * self.size,
+                                                 (y + 1) * self.size,
+                                                 fill='gray25',
+                                                 outline='')
+                    self.canvas.tag_raise(self.mascot)
+                    for icon in self.medal_icon.values():
+                        self.canvas.tag_raise(icon)
+        except StopIteration as end:
+            self.events = None
+            self.solution = end.value
+            if self.solution is not None:
+                self.actions = iter(self.solution)
+                self.canvas.after(self.time_interval, self.move)
+        else:
+            self.canvas.after(self.time_interval, self.explore)
 
     def animate(self):
         """
@@ -0,0 +1,417 @@
+# ----------------------------------------------------------------------
+# Name:     incremental_search
+# Purpose:  Replan the quest incrementally when the maze walls change
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Lifelong Planning A* (LPA*) for quests whose walls change
+
+An IncrementalPlanner keeps the costs found by its last search.  After
+walls are added or removed, only the states whose cost the edit can
+change are searched again, so replanning after a small edit usually
+expands a small fraction of the nodes of a new A* search.  An LPA*
+expansion costs more than an A* expansion, though (it updates the rhs
+of the successors of the state and looks up their predecessors), so a
+replan is not always faster than a new search.
+
+Usage:  incremental_search.py maze_file [options]
+Makes random wall edits next to the current solution path, replans
+after each one and compares the result, the nodes expanded and the
+time with a new astar search.
+
+Options:
+    -e (--edits): the number of wall edits
+    -s (--seed): the seed of the random number generator
+    -c (--compact): represent each search state as a single int
+
+Example:  incremental_search.py questF.txt -e 20 -s 1
+"""
+import argparse
+import collections
+import heapq
+import random
+import time
+import informed_search
+import spartanquest
+
+# The virtual goal state: every goal state leads to it at no cost
+GOAL = None
+
+
+class IncrementalPlanner(object):
+    """
+    Plan the quest with Lifelong Planning A* and replan after the
+    walls change.
+
+    The planner searches the same (position, medals) states as astar.
+    Each state has its cost g from the last search and a one step
+    lookahead cost rhs (the cheapest g of a predecessor plus the move
+    cost).  A state is consistent when both are equal, and only the
+    inconsistent states are queued.  A wall edit changes the moves into
+    and out of one position, so only the states at that position and
+    next to it get a new rhs.  The search then repairs the costs
+    starting from those states.
+
+    Arguments:
+    problem (a Problem object): the quest to plan
+    heuristic (function): a consistent heuristic that does not depend
+        on the walls - defaults to gen_heuristic.  The heuristics based
+        on carrot distances (distance_heuristic, mst_heuristic) are not
+        admissible after walls are removed, so do not use them.
+
+    Attributes:
+    problem (a Problem object): the quest being planned
+    start (state): the start state of the quest
+    """
+
+    def __init__(self, problem, heuristic=informed_search.gen_heuristic):
+        self.problem = problem
+        self.heuristic = heuristic
+        self.start = problem.start_state()
+        self.medal_order = problem.decode_state(self.start)[1]
+        self.medal_positions = set(self.medal_order)
+        self.g = {}
+        self.rhs = {self.start: 0}
+        self.estimates = {GOAL: 0}
+        self.goal_states = set()  # the goal states generated so far
+        self.states_at = collections.defaultdict(set)  # by maze index
+        self.fringe = []
+        self.queued = {}  # maps each queued state to its current key
+        self.count = 0
+        self._register(self.start)
+        self._queue(self.start)
+
+    def plan(self):
+        """
+        Find the cheapest solution with the current walls, reusing the
+        costs found by the previous calls.
+        :return: list of actions representing the solution to the quest
+                or None if there is no solution
+        """
+        self._compute_costs()
+        if self._cost(GOAL) == float('inf'):
+            return None
+        goal = min(self.goal_states, key=self._cost)
+        solution = []
+        state = goal
+        while state != self.start:
+            best = float('inf')
+            for previous, action, action_cost in self._predecessors(state):
+                cost = self._cost(previous) + action_cost
+                if cost < best:
+                    best, best_previous, best_action = cost, previous, action
+            solution.append(best_action)
+            state = best_previous
+        solution.reverse()
+        return solution
+
+    def add_wall(self, position):
+        """
+        Add a wall to the maze of the quest.
+        :param position: tuple (x, y) representing a maze position
+        :return: None
+        """
+        self._set_wall(position, True)
+
+    def remove_wall(self, position):
+        """
+        Remove a wall from the maze of the quest.
+        :param position: tuple (x, y) representing a maze position
+        :return: None
+        """
+        self._set_wall(position, False)
+
+    def _set_wall(self, position, wall):
+        """
+        Change the maze and update the states whose predecessors changed:
+        those at the position and next to it.  The states at the
+        position may not have been generated yet (it was a wall), so
+        they are found as the successors of the states next to it.
+        This is a private method.
+        :param
+        position: tuple (x, y) representing a maze position
+        wall (Boolean): True to add a wall, False to remove it
+        :return: None
+        """
+        maze = self.problem.maze
+        if not maze.within_bounds(position):
+            raise ValueError(f'{position} is outside the maze')
+        if maze.is_wall(position) == wall:
+            return
+        self.problem.set_wall(position, wall)
+        x, y = position
+        around = [position] + [(x + move_x, y + move_y) for move_x, move_y
+                               in self.problem.moves.values()]
+        changed = set()
+        for each in around:
+            if maze.within_bounds(each):
+                for state in self.states_at[maze.index(each)]:
+                    changed.add(state)
+                    if each != position:
+                        changed.update(child for child, action, action_cost
+                                       in self._successors(state))
+        changed.discard(GOAL)
+        for state in changed:
+            if state not in self.rhs:
+                self._register(state)
+            self._update(state)
+
+    def _cost(self, state):
+        """
+        Return the g value of the state.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: (number) the cost found, float('inf') if none
+        """
+        return self.g.get(state, float('inf'))
+
+    def _key(self, state):
+        """
+        Return the priority of the state in the fringe.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: (tuple) the f value and the cost of the state
+        """
+        cost = min(self.g.get(state, float('inf')),
+                   self.rhs.get(state, float('inf')))
+        estimate = self.estimates.get(state)
+        if estimate is None:
+            estimate = self.estimates[state] = \
+                self.heuristic(state, self.problem)
+        return cost + estimate, cost
+
+    def _queue(self, state):
+        """
+        Queue the state if it is inconsistent, or take it off the
+        fringe if it is consistent.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: None
+        """
+        if self.g.get(state, float('inf')) != \
+                self.rhs.get(state, float('inf')):
+            key = self._key(state)
+            if self.queued.get(state) != key:
+                self.queued[state] = key
+                heapq.heappush(self.fringe, (key, self.count, state))
+                self.count += 1
+        else:
+            self.queued.pop(state, None)  # its heap entry is now stale
+
+    def _top_key(self):
+        """
+        Return the lowest key in the fringe, dropping stale entries.
+        This is a private method.
+        :return: (tuple) the key or (inf, inf) if the fringe is empty
+        """
+        fringe = self.fringe
+        while fringe and self.queued.get(fringe[0][2]) != fringe[0][0]:
+            heapq.heappop(fringe)
+        if not fringe:
+            return float('inf'), float('inf')
+        return fringe[0][0]
+
+    def _register(self, state):
+        """
+        Remember a state reached by the search, by its maze position.
+        This is a private method.
+        :param state: a state of the quest
+        :return: None
+        """
+        problem = self.problem
+        position, medals = problem.decode_state(state)
+        self.states_at[problem.maze.index(position)].add(state)
+        if problem.is_goal(state):
+            self.goal_states.add(state)
+
+    def _update(self, state):
+        """
+        Recompute the rhs value of the state from its predecessors.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: None
+        """
+        if state == self.start:
+            return
+        self.rhs[state] = min((self._cost(previous) + action_cost
+                               for previous, action, action_cost
+                               in self._predecessors(state)),
+                              default=float('inf'))
+        self._queue(state)
+
+    def _compute_costs(self):
+        """
+        Expand the inconsistent states in order of priority until the
+        cost of the cheapest goal state is known.  The goal states have
+        the same key as the virtual goal, so the states whose key ties
+        with it are expanded as well: the path back from the virtual
+        goal only goes through consistent states.
+        This is a private method.
+        :return: None
+        """
+        while self._top_key() <= self._key(GOAL) or \
+                self.rhs.get(GOAL, float('inf')) != self._cost(GOAL):
+            if not self.fringe:
+                break  # the remaining states cannot reach a goal
+            key, order, state = heapq.heappop(self.fringe)
+            del self.queued[state]
+            old_cost = self._cost(state)
+            if old_cost > self.rhs[state]:
+                # a cheaper path was found: pass it on to the successors
+                cost = self.g[state] = self.rhs[state]
+                for child, action, action_cost in self._successors(state):
+                    if child is not GOAL and child not in self.rhs:
+                        self._register(child)
+                    if cost + action_cost < \
+                            self.rhs.get(child, float('inf')):
+                        self.rhs[child] = cost + action_cost
+                        self._queue(child)
+            else:
+                # the path got more expensive: the successors that
+                # relied on it must look for another predecessor
+                del self.g[state]
+                for child, action, action_cost in self._successors(state):
+                    if self.rhs.get(child) == old_cost + action_cost:
+                        self._update(child)
+                self._update(state)
+
+    def _successors(self, state):
+        """
+        Return the moves out of a state.  The goal states lead to the
+        virtual goal state.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: list of (state, action, cost) tuples
+        """
+        if state is GOAL:
+            return []
+        if self.problem.is_goal(state):
+            return [(GOAL, None, 0)]
+        return self.problem.expand(state)
+
+    def _predecessors(self, state):
+        """
+        Return the moves into a state.  Moving onto a position collects
+        its medal, so a state is reached either from a state with the
+        same medals left (unless none are left) or, at a medal position,
+        from a state that still had that medal.
+        This is a private method.
+        :param state: a state of the quest or GOAL
+        :return: list of (state, action, cost) tuples
+        """
+        if state is GOAL:
+            return [(goal, None, 0) for goal in self.goal_states]
+        problem = self.problem
+        maze = problem.maze
+        position, medals = problem.decode_state(state)
+        if position in medals:
+            return []  # only the start state can be on a medal
+        with_medal = None
+        if position in self.medal_positions:
+            with_medal = [medal for medal in self.medal_order
+                          if medal in medals or medal == position]
+        result = []
+        for previous, action, action_cost in \
+                maze.predecessors[maze.index(position)]:
+            previous_position = maze.positions[previous]
+            if medals:  # the goal states only lead to the virtual goal
+                result.append((problem.encode_state(previous_position,
+                                                    medals),
+                               action, action_cost))
+            if with_medal is not None:
+                result.append((problem.encode_state(previous_position,
+                                                    with_medal),
+                               action, action_cost))
+        return result
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the maze file and the options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('maze_file',
+                        help='name of the text file containing the maze info',
+                        type=argparse.FileType('r'))
+    parser.add_argument('-e', '--edits',
+                        help='number of wall edits',
+                        type=int,
+                        default=10)
+    parser.add_argument('-s', '--seed',
+                        help='seed of the random number generator',
+                        type=int,
+                        default=0)
+    parser.add_argument('-c', '--compact',
+                        help='represent each search state as a single int',
+                        action='store_true')
+    return parser.parse_args()
+
+
+def main():
+    arguments = get_arguments()
+    quest = spartanquest.Problem(arguments.maze_file, arguments.compact)
+    generator = random.Random(arguments.seed)
+    planner = IncrementalPlanner(quest)
+    start_time = time.perf_counter()
+    solution = planner.plan()
+    print(f'Initial plan: {quest.nodes_expanded():,} nodes expanded in '
+          f'{time.perf_counter() - start_time:.4f}(sec)')
+    print(f'{"edit":<22}{"carrots":>8}{"LPA* nodes":>12}{"LPA* sec":>10}'
+          f'{"A* nodes":>10}{"A* sec":>9}')
+    maze = quest.maze
+    fixed = {quest.mascot_position} | quest.medals
+    totals = [0, 0.0, 0, 0.0]  # LPA* nodes and time, A* nodes and time
+    edits = faster = 0  # the edits made, the replans faster than A*
+    for each_edit in range(arguments.edits):
+        # edit a position on or next to the current path
+        path = [quest.mascot_position]
+        for action in solution or []:
+            move_x, move_y = quest.moves[action]
+            path.append((path[-1][0] + move_x, path[-1][1] + move_y))
+        x, y = generator.choice(path)
+        candidates = [(x + move_x, y + move_y) for move_x, move_y
+                      in [(0, 0)] + list(quest.moves.values())]
+        candidates = [position for position in candidates
+                      if maze.within_bounds(position)
+                      and position not in fixed]
+        if not candidates:
+            continue
+        position = generator.choice(candidates)
+        wall = not maze.is_wall(position)
+        before = quest.nodes_expanded()
+        start_time = time.perf_counter()
+        if wall:
+            planner.add_wall(position)
+        else:
+            planner.remove_wall(position)
+        solution = planner.plan()
+        planner_time = time.perf_counter() - start_time
+        planner_nodes = quest.nodes_expanded() - before
+        before = quest.nodes_expanded()
+        start_time = time.perf_counter()
+        expected = informed_search.astar(quest, informed_search.gen_heuristic)
+        astar_time = time.perf_counter() - start_time
+        astar_nodes = quest.nodes_expanded() - before
+        carrots = quest.path_cost(solution) if solution is not None \
+            else None
+        if carrots != (quest.path_cost(expected) if expected is not None
+                       else None):
+            print('The incremental plan is not optimal!')
+        edit = ('add wall ' if wall else 'remove wall ') + str(position)
+        print(f'{edit:<22}{str(carrots):>8}{planner_nodes:>12,}'
+              f'{planner_time:>10.4f}{astar_nodes:>10,}{astar_time:>9.4f}')
+        for number, value in enumerate((planner_nodes, planner_time,
+                                        astar_nodes, astar_time)):
+            totals[number] += value
+        edits += 1
+        faster += planner_time < astar_time
+    print(f'{"total":<22}{"":>8}{totals[0]:>12,}{totals[1]:>10.4f}'
+          f'{totals[2]:>10,}{totals[3]:>9.4f}')
+    print(f'The replan was faster than a new A* search after {faster} of '
+          f'{edits} edits')
+
+
+if __name__ == '__main__':
+    main()
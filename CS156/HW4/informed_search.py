@@ -12,14 +12,342 @@ Your task for homework 4 is to implement:
 2.  single_heuristic
 3.  better_heuristic
 4.  gen_heuristic
+
+Additional search algorithms:
+    astar_events: astar as a generator of expansion events
+    astar_indexed: A* that never queues dominated duplicates
+    bidirectional: bidirectional A* for quests with a single medal
+        (only saves work over astar with null_heuristic)
+    idastar: iterative deepening A* with memory linear in the depth
+    jps_astar: A* with jump point search for uniform move costs
+    weighted_astar: A* with a weighted heuristic, bounded suboptimal
+    anytime_astar: anytime repairing A* yielding improving solutions
+    medal_tour: dynamic programming over the order of the medals
+Additional heuristics:
+    distance_heuristic: true carrot distances to the medals
+    mst_heuristic: nearest medal plus a spanning tree of the medals
 """
+import collections
+import heapq
+import time
 import data_structures
+import search_kernel
 
 
-def astar(problem, heuristic):
+def astar(problem, heuristic, cache_size=1 << 20, stats=None):
     """
     A* graph search algorithm
     returns a solution for the given search problem
+    The heuristic value of each state is saved in a bounded cache, so
+    a state generated again costs a lookup instead of another heuristic
+    evaluation.  The cache hits and misses are recorded in the problem
+    statistics.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    cache_size (int) the maximum number of heuristic values to keep
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    if stats is not None:
+        heuristic = stats.timed_heuristic(heuristic)
+    # heuristic value of the states generated so far, oldest first
+    estimates = collections.OrderedDict()
+    hits = misses = 0
+
+    def priority(state, cost):
+        # cumulative cost + the saved or new heuristic value
+        nonlocal hits, misses
+        estimate = estimates.get(state)
+        if estimate is None:
+            misses += 1
+            estimate = heuristic(state, problem)
+            if len(estimates) >= cache_size:
+                estimates.popitem(last=False)  # the oldest
+            estimates[state] = estimate
+        else:
+            hits += 1
+        return cost + estimate
+
+    # for A*, the fringe is a PriorityQueue
+    solution = search_kernel.best_first_search(
+        problem, data_structures.PriorityQueue(), priority, stats)
+    problem.record('heuristic_hits', hits)
+    problem.record('heuristic_misses', misses)
+    return solution
+
+
+def astar_events(problem, heuristic, stats=None):
+    """
+    A* graph search algorithm as a generator
+    See search_kernel.best_first_events: the f value of each event is
+    the cumulative cost + the heuristic value of the state expanded.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: generator yielding an Expansion event for each state
+            expanded and returning the solution (see astar)
+    """
+    if stats is not None:
+        heuristic = stats.timed_heuristic(heuristic)
+
+    def priority(state, cost):
+        return cost + heuristic(state, problem)
+
+    return search_kernel.best_first_events(
+        problem, data_structures.PriorityQueue(), priority, stats)
+
+
+def astar_indexed(problem, heuristic):
+    """
+    A* graph search algorithm that never queues dominated duplicates.
+    The fringe holds at most one node per state: a cheaper path to a
+    queued state replaces the queued node (decrease-key) and a path
+    that is not cheaper is dropped, as is any path to an explored state.
+    Running it with the null heuristic gives us uniform cost search.
+    The number of stale fringe entries avoided this way is recorded in
+    the problem statistics.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    closed = set()  # keep track of our explored states
+    fringe = data_structures.IndexedPriorityQueue()
+    state = problem.start_state()
+    root = data_structures.Node(state, None, None)
+    fringe.push(state, root, heuristic(state, problem))
+    explored_children = 0  # children skipped because already explored
+    solution = None
+    while not fringe.is_empty():
+        node = fringe.pop()
+        if problem.is_goal(node.state):
+            solution = node.solution()  # we found a solution
+            break
+        closed.add(node.state)
+        for child_state, action, action_cost in problem.expand(node.state):
+            if child_state in closed:
+                explored_children += 1
+                continue
+            cost = node.cumulative_cost + action_cost
+            queued = fringe.get(child_state)
+            if queued is not None and queued.cumulative_cost <= cost:
+                fringe.rejected += 1  # dominated by the queued node
+                continue
+            child_node = data_structures.Node(child_state, node, action, cost)
+            fringe.push(child_state, child_node,
+                        cost + heuristic(child_state, problem))
+    problem.record('stale_pops_avoided',
+                   fringe.decreased + fringe.rejected + explored_children)
+    problem.record('fringe_peak', fringe.peak_size)
+    return solution
+
+
+def bidirectional(problem, heuristic):
+    """
+    Bidirectional A* graph search algorithm for quests with one medal.
+    With a single medal the goal is a single maze position, so we
+    search forward from Sammy and backward from the medal and stop when
+    no path through the unexplored positions can beat the best meeting
+    point found.  The backward search follows the moves into each
+    position with the cost of the move in its forward direction.
+    The forward search uses the given heuristic and the backward
+    search the directional Manhattan cost from Sammy (both are 0 with
+    the null heuristic, which gives us bidirectional uniform cost
+    search).  Other quests are solved with astar.
+    Only bidirectional uniform cost search saves work over astar
+    (questE: 165 nodes expanded instead of 383).  With an informed
+    heuristic, the two searches meet late and it expands about as many
+    nodes as astar or more (questE: 24 instead of 22 with gen_heuristic,
+    18 instead of 12 with distance_heuristic), so use astar then.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    start, medals = problem.decode_state(problem.start_state())
+    if len(medals) != 1 or medals[0] == start:
+        return astar(problem, heuristic)
+    maze = problem.maze
+    positions = maze.positions
+    source = maze.index(start)
+    target = maze.index(medals[0])
+    informed = heuristic is not null_heuristic
+
+    def forward_estimate(index):
+        # estimated cost from the position to the medal
+        state = problem.encode_state(positions[index], medals)
+        return heuristic(state, problem)
+
+    def backward_estimate(index):
+        # estimated cost from Sammy to the position
+        if informed:
+            return manhattan_cost(start, positions[index], problem)
+        return 0
+
+    estimate = (forward_estimate, backward_estimate)
+    expand = (problem.successors, problem.predecessors)
+    cost_so_far = ({source: 0}, {target: 0})
+    # parent[0] maps a position to the previous one on its path from
+    # Sammy, parent[1] to the next one on its path to the medal
+    parent = ({source: None}, {target: None})
+    closed = (set(), set())
+    fringe = ([(forward_estimate(source), 0, source)],
+              [(backward_estimate(target), 0, target)])
+    count = 1
+    best_cost = float('inf')
+    meeting_point = None
+    while fringe[0] and fringe[1]:
+        forward_top, backward_top = fringe[0][0][0], fringe[1][0][0]
+        if max(forward_top, backward_top) >= best_cost:
+            break  # no unexplored path can be cheaper
+        if not informed and forward_top + backward_top >= best_cost:
+            break
+        # expand the direction with the smaller fringe
+        side = 0 if len(fringe[0]) <= len(fringe[1]) else 1
+        priority, order, index = heapq.heappop(fringe[side])
+        if index in closed[side]:
+            continue  # stale fringe entry
+        closed[side].add(index)
+        costs = cost_so_far[side]
+        other_costs = cost_so_far[1 - side]
+        for neighbor, action, action_cost in expand[side](index):
+            cost = costs[index] + action_cost
+            if cost < costs.get(neighbor, float('inf')):
+                costs[neighbor] = cost
+                parent[side][neighbor] = (index, action)
+                heapq.heappush(fringe[side],
+                               (cost + estimate[side](neighbor), count,
+                                neighbor))
+                count += 1
+                if neighbor in other_costs and \
+                        cost + other_costs[neighbor] < best_cost:
+                    best_cost = cost + other_costs[neighbor]
+                    meeting_point = neighbor
+    if meeting_point is None:
+        return None  # Failure -  no solution was found
+    solution = []
+    index = meeting_point
+    while parent[0][index] is not None:
+        index, action = parent[0][index]
+        solution.append(action)
+    solution.reverse()
+    index = meeting_point
+    while parent[1][index] is not None:
+        index, action = parent[1][index]
+        solution.append(action)
+    return solution
+
+
+def idastar(problem, heuristic, transposition=True, table_size=1 << 20):
+    """
+    Iterative deepening A* graph search algorithm
+    Repeats a depth first search that prunes every node whose f value
+    (cumulative cost + heuristic) exceeds a bound, raising the bound to
+    the lowest pruned f value after each pass.  States already on the
+    current path are skipped.
+    By default, a bounded transposition table keeps the lowest cost at
+    which each state was reached during the current pass, and any path
+    that reaches it again at no lower cost is pruned: within a pass, a
+    state is only expanded again when it is reached at a lower cost.
+    Without the table, only the current path is kept in memory, but a
+    state is expanded again for every path that reaches it: the maze
+    grids have so many transpositions that the passes grow
+    exponentially, and an unsolvable quest (noway.txt) does not finish
+    in any practical time.  Turn the table off only for state spaces
+    that are close to trees.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    transposition (Boolean) False to search without a transposition
+            table - defaults to True
+    table_size (int) the maximum number of states in the table
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    state = problem.start_state()
+    if problem.is_goal(state):
+        return []
+    bound = heuristic(state, problem)
+    while bound < float('inf'):
+        next_bound = float('inf')
+        table = {state: 0}  # the transposition table
+        path = [state]
+        on_path = {state}
+        costs = [0]  # cumulative cost of each state on the path
+        actions = []
+        children = [iter(problem.expand(state))]
+        while children:
+            for child_state, action, action_cost in children[-1]:
+                if child_state in on_path:
+                    continue
+                cost = costs[-1] + action_cost
+                f = cost + heuristic(child_state, problem)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+                if problem.is_goal(child_state):
+                    return actions + [action]  # we found a solution
+                if transposition:
+                    if table.get(child_state, float('inf')) <= cost:
+                        continue
+                    if len(table) < table_size:
+                        table[child_state] = cost
+                # go one level deeper
+                path.append(child_state)
+                on_path.add(child_state)
+                costs.append(cost)
+                actions.append(action)
+                children.append(iter(problem.expand(child_state)))
+                break
+            else:
+                # all children done: backtrack
+                children.pop()
+                on_path.discard(path.pop())
+                costs.pop()
+                if actions:
+                    actions.pop()
+        bound = next_bound
+    return None  # Failure -  no solution was found
+
+
+def uniform_costs(problem):
+    """
+    Tell whether every move of the problem costs the same, which jump
+    point search needs (see jps_astar).
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    :return: (Boolean) True if every move costs the same
+    """
+    return len(set(problem.cost.values())) == 1
+
+
+def jps_astar(problem, heuristic):
+    """
+    A* graph search algorithm with jump point search
+    When every move costs the same, many shortest paths through open
+    areas only differ in the order of their moves.  Jump point search
+    only follows canonical paths: vertical moves first, horizontal
+    moves that turn vertical only where a wall forces the turn.  It
+    jumps in a straight line until it reaches a medal or a position
+    where a canonical path can turn (a jump point) and only queues
+    those positions.  Collecting a medal starts a new search from that
+    position in every direction.  Each jump point counts as one
+    expanded node.  When the moves do not all cost the same, as with
+    the move costs of the quests, we fall back to astar and record it
+    in the astar_fallbacks statistic.
     :param
     problem (a Problem object) representing the quest
             see Problem class definition in spartanquest.py
@@ -27,24 +355,328 @@ def astar(problem, heuristic):
     :return: list of actions representing the solution to the quest
                 or None if there is no solution
     """
-    # Enter your code here and remove the pass statement below
+    if not uniform_costs(problem):
+        problem.record('astar_fallbacks', 1)
+        return astar(problem, heuristic)
+    maze = problem.maze
+    moves = problem.moves
+    step_cost = problem.cost[problem.EAST]
+    horizontal = (problem.EAST, problem.WEST)
+    vertical = (problem.NORTH, problem.SOUTH)
+
+    def is_open(x, y):
+        return maze.within_bounds((x, y)) and not maze.is_wall((x, y))
+
+    def forced_turns(x, y, action):
+        # vertical turns forced at (x, y) when moving horizontally:
+        # the position behind us is blocked in that direction
+        behind_x = x - moves[action][0]
+        return [turn for turn in vertical
+                if is_open(x, y + moves[turn][1])
+                and not is_open(behind_x, y + moves[turn][1])]
+
+    def jump(x, y, action, medals):
+        # return the next jump point (x, y, steps) in that direction
+        # or None if we run into a wall first
+        move_x, move_y = moves[action]
+        steps = 0
+        while True:
+            x += move_x
+            y += move_y
+            steps += 1
+            if not is_open(x, y):
+                return None
+            if (x, y) in medals:
+                return x, y, steps
+            if action in horizontal:
+                if forced_turns(x, y, action):
+                    return x, y, steps
+            elif jump(x, y, problem.EAST, medals) or \
+                    jump(x, y, problem.WEST, medals):
+                return x, y, steps
+
     closed = set()  # keep track of our explored states
-    fringe = data_structures.PriorityQueue()  # for A*, the fringe is a PriorityQueue
+    fringe = data_structures.PriorityQueue()
     state = problem.start_state()
     root = data_structures.Node(state, None, None)
-    fringe.push(root, root.cumulative_cost)  # cumulative cost is the priority from root
+    fringe.push(root, root.cumulative_cost)
     while not fringe.is_empty():
         node = fringe.pop()
         if problem.is_goal(node.state):
-            return node.solution()  # we found a solution
-        if node.state not in closed:  # we are implementing graph search
-            closed.add(node.state)
-            for child_state, action, action_cost in problem.expand(node.state):
-                # update cumulative cost
-                child_node = data_structures.Node(child_state, node, action, node.cumulative_cost + action_cost)
-                # update new heuristic
-                fringe.push(child_node, child_node.cumulative_cost + heuristic(child_state, problem))
-    pass
+            # each jump is a (action, steps) pair
+            return [action for action, steps in node.solution()
+                    for step in range(steps)]
+        if node.state in closed:
+            continue
+        closed.add(node.state)
+        position, medals = problem.decode_state(node.state)
+        x, y = position
+        valid_moves = {action for neighbor, action, action_cost
+                       in problem.successors(maze.index(position))}
+        if node.parent is None or \
+                medals != problem.decode_state(node.parent.state)[1]:
+            directions = list(moves)  # start or medal collected
+        elif node.action[0] in vertical:
+            directions = [node.action[0], problem.EAST, problem.WEST]
+        else:
+            directions = [node.action[0]] + \
+                         forced_turns(x, y, node.action[0])
+        medal_set = set(medals)
+        for action in directions:
+            if action not in valid_moves:
+                continue
+            jump_point = jump(x, y, action, medal_set)
+            if jump_point is None:
+                continue
+            new_x, new_y, steps = jump_point
+            new_medals = [medal for medal in medals if medal != (new_x, new_y)]
+            child_state = problem.encode_state((new_x, new_y), new_medals)
+            if child_state in closed:
+                continue
+            cost = node.cumulative_cost + steps * step_cost
+            child_node = data_structures.Node(child_state, node,
+                                              (action, steps), cost)
+            fringe.push(child_node, cost + heuristic(child_state, problem))
+    return None  # Failure -  no solution was found
+
+
+def weighted_astar(problem, heuristic, weight=2.0):
+    """
+    Weighted A* graph search algorithm
+    Orders the fringe by cumulative cost + weight * heuristic, which
+    favors the nodes closer to the goal.  With an admissible heuristic
+    the solution costs at most weight times the optimal cost, and is
+    usually found after far fewer expansions.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the heuristic function to be used
+    weight (number >= 1) the weight of the heuristic
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    def priority(state, cost):
+        return cost + weight * heuristic(state, problem)
+
+    return search_kernel.best_first_search(
+        problem, data_structures.PriorityQueue(), priority)
+
+
+def anytime_astar(problem, heuristic, weight=3.0, decrement=0.5,
+                  deadline=None):
+    """
+    Anytime repairing A* (ARA*) graph search algorithm
+    Returns a generator that runs weighted A* with a decreasing weight
+    and yields each solution it finds together with a bound on how far
+    it is from optimal.  Each pass reuses the costs found by the
+    previous passes: only the states whose cost improved after they
+    were explored are explored again.  The last solution yielded, with
+    a bound of 1, is optimal.  Stop iterating at any time to keep the
+    best solution so far.  With a deadline, the pass running when it
+    passes is cut short: the best solution so far is yielded (if it was
+    not yet) and the generator ends.  If the deadline passes before any
+    solution is found, (None, None) is yielded: no solution yet.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) the (admissible) heuristic function
+    weight (number >= 1) the weight of the heuristic in the first pass
+    decrement (number > 0) the decrease of the weight after each pass
+    deadline (float) the time.perf_counter() value after which no more
+            states are expanded - defaults to no deadline
+    :return: generator yielding tuples (solution, bound): a list of
+        actions and the highest possible ratio of its cost to the
+        optimal cost, None while no bound is known (the deadline cut
+        the first pass short).  Nothing is yielded if there is no
+        solution.
+    """
+    if weight < 1:
+        raise ValueError('the weight must be at least 1')
+    if decrement <= 0:
+        raise ValueError('the decrement must be positive')
+    return _anytime_passes(problem, heuristic, weight, decrement, deadline)
+
+
+def _anytime_passes(problem, heuristic, weight, decrement, deadline):
+    """
+    The passes of anytime_astar, once its parameters are checked
+    :param: see anytime_astar
+    :return: see anytime_astar
+    """
+    state = problem.start_state()
+    if problem.is_goal(state):
+        yield [], 1.0
+        return
+    estimates = {}
+
+    def estimate(each_state):
+        if each_state not in estimates:
+            estimates[each_state] = heuristic(each_state, problem)
+        return estimates[each_state]
+
+    cost_so_far = {state: 0}
+    parent = {state: None}  # maps a state to (previous state, action)
+    fringe = [(weight * estimate(state), 0, state)]
+    count = 1
+    closed = set()
+    inconsistent = set()  # improved after being explored in this pass
+    goal = None
+    goal_cost = float('inf')
+    reported = None  # the cost and bound yielded last
+    expired = False
+    completed = float('inf')  # the weight of the last pass completed
+    while True:
+        while fringe and fringe[0][0] < goal_cost:
+            if deadline is not None and time.perf_counter() >= deadline:
+                expired = True
+                break
+            priority, order, node_state = heapq.heappop(fringe)
+            if node_state in closed or priority > \
+                    cost_so_far[node_state] + weight * estimate(node_state):
+                continue  # stale fringe entry
+            closed.add(node_state)
+            for child_state, action, action_cost in problem.expand(node_state):
+                cost = cost_so_far[node_state] + action_cost
+                if cost < cost_so_far.get(child_state, float('inf')):
+                    cost_so_far[child_state] = cost
+                    parent[child_state] = (node_state, action)
+                    if problem.is_goal(child_state):
+                        if cost < goal_cost:
+                            goal, goal_cost = child_state, cost
+                    elif child_state in closed:
+                        inconsistent.add(child_state)
+                    else:
+                        heapq.heappush(fringe, (cost + weight *
+                                                estimate(child_state),
+                                                count, child_state))
+                        count += 1
+        if goal is None:
+            if expired:
+                yield None, None  # no solution yet
+            return  # Failure -  no solution was found
+        if not expired:
+            completed = weight  # only a completed pass bounds the cost
+        # every cheaper solution goes through one of these states
+        pending = inconsistent | {entry[2] for entry in fringe
+                                  if entry[2] not in closed}
+        lower = min((cost_so_far[each] + estimate(each) for each in pending),
+                    default=float('inf'))
+        bound = max(1.0, min(completed, goal_cost / lower)) if lower \
+            else completed
+        if bound == float('inf'):
+            bound = None  # no pass completed and no lower bound either
+        if (goal_cost, bound) != reported:
+            reported = (goal_cost, bound)
+            solution = []
+            node_state = goal
+            while parent[node_state] is not None:
+                node_state, action = parent[node_state]
+                solution.append(action)
+            solution.reverse()
+            yield solution, bound
+        if expired or bound == 1.0 or weight <= 1.0:
+            return
+        weight = max(1.0, weight - decrement)
+        fringe = [(cost_so_far[each] + weight * estimate(each), order, each)
+                  for order, each in enumerate(pending, count)]
+        count += len(fringe)
+        heapq.heapify(fringe)
+        closed.clear()
+        inconsistent.clear()
+
+
+def medal_tour(problem, heuristic=None):
+    """
+    Solve the quest by choosing the order in which to collect the
+    medals instead of searching the (position, medals) states.
+    Any solution collects the medals in some order, and costs at least
+    the sum of the cheapest paths between consecutive medals in that
+    order, so the cheapest order gives an optimal solution.
+    The cheapest paths to each medal come from a single backward
+    Dijkstra per medal (see Problem.distances_to), the best order from
+    the Held-Karp dynamic program over the subsets of medals, and the
+    solution is the cheapest paths of that order stitched together.
+    The work grows with the number of maze positions times the number
+    of medals plus the number of medals squared times 2 ** medals,
+    so it suits large mazes with few medals.  Each position popped by
+    the Dijkstra searches and each position on the solution path
+    counts as one expanded node.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    heuristic (a function) ignored, so medal_tour can be called like
+            the other search algorithms
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    maze = problem.maze
+    sammy, medals = problem.decode_state(problem.start_state())
+    count = len(medals)
+    if not count:
+        return []
+    tables = [problem.distances_to(medal, counted=True) for medal in medals]
+    targets = [maze.index(medal) for medal in medals]
+    source = maze.index(sammy)
+
+    def leg_cost(index, medal):
+        # carrots from the position to the medal: a medal under Sammy
+        # is only collected by leaving it and coming back
+        table = tables[medal]
+        if index != targets[medal]:
+            return table[index]
+        return min((action_cost + table[neighbor] for neighbor, action,
+                    action_cost in maze.neighbors[index]),
+                   default=float('inf'))
+
+    first = [leg_cost(source, medal) for medal in range(count)]
+    between = [[tables[medal][targets[previous]]
+                for medal in range(count)] for previous in range(count)]
+    # cost[subset][medal]: the cheapest way to collect the medals of the
+    # subset (a bitmask) ending with the given medal
+    full = (1 << count) - 1
+    cost = [[float('inf')] * count for subset in range(full + 1)]
+    previous_medal = [[None] * count for subset in range(full + 1)]
+    for medal in range(count):
+        cost[1 << medal][medal] = first[medal]
+    for subset in range(1, full + 1):
+        subset_cost = cost[subset]
+        for last in range(count):
+            last_cost = subset_cost[last]
+            if last_cost == float('inf') or not subset >> last & 1:
+                continue
+            costs_from_last = between[last]
+            for medal in range(count):
+                if subset >> medal & 1:
+                    continue
+                new_subset = subset | 1 << medal
+                new_cost = last_cost + costs_from_last[medal]
+                if new_cost < cost[new_subset][medal]:
+                    cost[new_subset][medal] = new_cost
+                    previous_medal[new_subset][medal] = last
+    last = min(range(count), key=lambda medal: cost[full][medal])
+    if cost[full][last] == float('inf'):
+        return None  # Failure -  no solution was found
+    order = []
+    subset = full
+    while last is not None:
+        order.append(last)
+        subset, last = subset & ~(1 << last), previous_medal[subset][last]
+    order.reverse()
+    # stitch the cheapest paths together, following the moves that keep
+    # the remaining carrots to the next medal on track
+    solution = []
+    index = source
+    for medal in order:
+        table = tables[medal]
+        remaining = leg_cost(index, medal)
+        while remaining:
+            for neighbor, action, action_cost in problem.successors(index):
+                if action_cost + table[neighbor] == remaining:
+                    solution.append(action)
+                    index = neighbor
+                    remaining = table[neighbor]
+                    break
+    return solution
 
 
 def null_heuristic(state, problem):
@@ -74,7 +706,7 @@ def single_heuristic(state, problem):
     :return: Manhattan distance, 0 if no medals leftover
     """
     # unpack tuple for sammy and medal
-    sammy, medal = state
+    sammy, medal = problem.decode_state(state)
     # if there is a medal
     if medal:
         # return Manhattan distance
@@ -131,7 +763,7 @@ def better_heuristic(state, problem):
     :return: Manhattan distance * cost of each move, 0 if no medal
     """
     # unpack tuple for sammy and medal
-    sammy, medal = state
+    sammy, medal = problem.decode_state(state)
     # if there is a medal
     if medal:
         return manhattan_cost(sammy, medal[0], problem)
@@ -152,10 +784,108 @@ def gen_heuristic(state, problem):
     :return: the highest better heuristic out of the medals, 0 if no medals leftover
     """
     # unpack tuple for sammy and medal
-    sammy, medals = state
+    sammy, medals = problem.decode_state(state)
     # if there are any medals
     if medals:
         # return the max heuristic out of the medals
         return max(manhattan_cost(sammy, medal, problem) for medal in medals)
     else:
-        return 0
\ No newline at end of file
+        return 0
+
+
+def distance_heuristic(state, problem):
+    """
+    Distance heuristic based on the true number of carrots Sammy needs
+    to reach each medal, walls included.  The carrots to every maze
+    position are computed once per medal (see Problem.distances_to), so
+    each evaluation is a lookup.  Sammy must still reach every remaining
+    medal, so the max over the medals is admissible, and it is never
+    lower than gen_heuristic.
+    :param
+    state: A state is represented by a tuple containing:
+                the current position of Sammy the Spartan
+                a tuple containing the positions of the remaining medals
+    problem: (a Problem object) representing the quest
+    :return: the highest distance to a remaining medal, 0 if no medals
+    """
+    sammy, medals = problem.decode_state(state)
+    if medals:
+        index = problem.maze.index(sammy)
+        return max(problem.distances_to(medal)[index] for medal in medals)
+    else:
+        return 0
+
+
+def mst_heuristic(state, problem):
+    """
+    Minimum spanning tree heuristic based on the true carrot distances.
+    Sammy must reach some first medal and then visit all the other
+    medals from there, so any solution costs at least the distance to
+    that medal plus a lower bound on the path through the medals that
+    starts from it (see medal_path_bounds).  We take the cheapest
+    choice of first medal, which keeps the heuristic admissible.  The
+    result is never lower than distance_heuristic.  Many states share
+    the same remaining medals, so the path bounds are kept in the LRU
+    cache of the problem keyed by the tuple of remaining medals (see
+    Problem.medal_bounds).
+    :param
+    state: A state is represented by a tuple containing:
+                the current position of Sammy the Spartan
+                a tuple containing the positions of the remaining medals
+    problem: (a Problem object) representing the quest
+    :return: the lowest cost of reaching a first medal and linking the
+        medals from there, 0 if no medals leftover
+    """
+    sammy, medals = problem.decode_state(state)
+    if medals:
+        index = problem.maze.index(sammy)
+        distances = [problem.distances_to(medal)[index] for medal in medals]
+        bounds = problem.medal_bounds(medals, medal_path_bounds)
+        return max(min(map(sum, zip(distances, bounds))), max(distances))
+    else:
+        return 0
+
+
+def medal_path_bounds(problem, medals):
+    """
+    Helper function to calculate, for each of the given medals, a lower
+    bound on the carrots needed to visit all the medals starting from
+    that medal.
+    The path through the medals is a spanning tree of the medals, so it
+    costs at least the weight of a minimum spanning tree (Prim's
+    algorithm) in which each edge weighs the cheaper of its two
+    directions.  Every medal but the first is entered from another
+    medal, and every medal but the last is left for another medal, so
+    the path also costs at least the cheapest ways into the other
+    medals, and the cheapest ways out of the medals minus the most
+    expensive of them.  We use the highest of the three bounds.
+    :param
+    problem: (a Problem object) representing the quest
+    medals: a tuple containing the positions of the medals
+    :return: tuple of lower bounds, one per medal in the same order
+    """
+    if len(medals) < 2:
+        return (0,) * len(medals)
+    index = problem.maze.index
+    distances = [problem.distances_to(medal) for medal in medals]
+    # cost[i][j]: carrots from medal i to medal j
+    cost = [[distances[j][index(medal)] for j in range(len(medals))]
+            for medal in medals]
+    others = [[j for j in range(len(medals)) if j != i]
+              for i in range(len(medals))]
+    cheapest_in = [min(cost[j][i] for j in others[i])
+                   for i in range(len(medals))]
+    cheapest_out = [min(cost[i][j] for j in others[i])
+                    for i in range(len(medals))]
+    tree = 0
+    # cheapest edge from the tree to each medal not in the tree yet
+    remaining = {j: min(cost[0][j], cost[j][0]) for j in others[0]}
+    while remaining:
+        closest = min(remaining, key=remaining.get)
+        tree += remaining.pop(closest)
+        for j in remaining:
+            remaining[j] = min(remaining[j], cost[closest][j],
+                               cost[j][closest])
+    out_bound = sum(cheapest_out) - max(cheapest_out)
+    return tuple(max(tree, sum(cheapest_in) - cheapest_in[first], out_bound)
+                 for first in range(len(medals)))
@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------
+# Name:     maze_generator
+# Purpose:  Generate random quests for spartanquest
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Random quest generator for spartanquest
+
+Usage:  maze_generator.py width height [options]
+The maze is written in the spartanquest format: W for a wall, M for a
+medal, S for Sammy and - for a vacant position.  Each position is a
+wall with the given probability.  Sammy and the medals are placed on
+distinct vacant positions that Sammy can reach, so the quest always
+has a solution.
+
+Options:
+    -d (--density): the probability that a position is a wall
+    -m (--medals): the number of medals
+    -s (--seed): the seed of the random number generator, for
+        reproducible mazes
+    -o (--output): the name of the maze file (defaults to the screen)
+
+Example:  maze_generator.py 200 100 -d 0.3 -m 5 -s 1 -o maze200.txt
+"""
+import argparse
+import collections
+import random
+import sys
+
+# The number of times we place Sammy before giving up on a maze whose
+# reachable area is too small for the medals
+ATTEMPTS = 100
+# Translation table mapping 0 to a vacant position and 1 to a wall
+CHARACTERS = bytes([ord('-'), ord('W')]) + bytes(254)
+
+
+def reachable(walls, width, height, start):
+    """
+    Find the positions reachable from the start position.
+    :param
+    walls (bytearray): 1 for each wall position in row major order
+    width (int): the width of the maze
+    height (int): the height of the maze
+    start (int): the index of the start position
+    :return: list of the indices of the reachable positions, in breadth
+        first order
+    """
+    seen = bytearray(width * height)
+    seen[start] = 1
+    found = [start]
+    fringe = collections.deque(found)
+    while fringe:
+        index = fringe.popleft()
+        y, x = divmod(index, width)
+        for new_x, new_y in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= new_x < width and 0 <= new_y < height:
+                new_index = new_y * width + new_x
+                if not walls[new_index] and not seen[new_index]:
+                    seen[new_index] = 1
+                    found.append(new_index)
+                    fringe.append(new_index)
+    return found
+
+
+def generate_maze(width, height, density=0.3, medals=3, seed=None):
+    """
+    Generate a random quest.
+    :param
+    width (int): the width of the maze
+    height (int): the height of the maze
+    density (float): the probability that a position is a wall
+    medals (int): the number of medals
+    seed: the seed of the random number generator - defaults to None
+        (a different maze each time)
+    :return: list of strings, one per row of the maze
+    """
+    if width < 1 or height < 1:
+        raise ValueError('the maze must be at least 1 by 1')
+    if not 0 <= density < 1:
+        raise ValueError('the wall density must be in [0, 1)')
+    generator = random.Random(seed)
+    walls = bytearray(generator.random() < density
+                      for index in range(width * height))
+    for attempt in range(ATTEMPTS):
+        start = generator.randrange(width * height)
+        if walls[start]:
+            continue
+        area = reachable(walls, width, height, start)
+        if len(area) > medals:
+            break
+    else:
+        raise ValueError('the maze is too dense to hold the medals')
+    grid = walls.translate(CHARACTERS)
+    for index in generator.sample(area[1:], medals):
+        grid[index] = ord('M')
+    grid[start] = ord('S')
+    return [grid[row:row + width].decode('ascii')
+            for row in range(0, width * height, width)]
+
+
+def write_maze(rows, file):
+    """
+    Write a maze in the spartanquest format.
+    :param
+    rows (list of strings): the rows of the maze
+    file (file object): the file to write to
+    :return: None
+    """
+    file.write('\n'.join(rows))
+    file.write('\n')
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the maze size and the options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('width',
+                        help='width of the maze',
+                        type=int)
+    parser.add_argument('height',
+                        help='height of the maze',
+                        type=int)
+    parser.add_argument('-d', '--density',
+                        help='probability that a position is a wall',
+                        type=float,
+                        default=0.3)
+    parser.add_argument('-m', '--medals',
+                        help='number of medals',
+                        type=int,
+                        default=3)
+    parser.add_argument('-s', '--seed',
+                        help='seed of the random number generator',
+                        type=int,
+                        default=None)
+    parser.add_argument('-o', '--output',
+                        help='name of the maze file',
+                        default=None)
+    return parser.parse_args()
+
+
+def main():
+    arguments = get_arguments()
+    rows = generate_maze(arguments.width, arguments.height,
+                         arguments.density, arguments.medals,
+                         arguments.seed)
+    if arguments.output is None:
+        write_maze(rows, sys.stdout)
+    else:
+        with open(arguments.output, 'w') as file:
+            write_maze(rows, file)
+
+
+if __name__ == '__main__':
+    main()
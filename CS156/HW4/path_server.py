@@ -0,0 +1,296 @@
+# ----------------------------------------------------------------------
+# Name:     path_server
+# Purpose:  Answer many shortest carrot path queries on one maze
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Shortest carrot path query server
+
+The maze is loaded once and each query asks for the cheapest path (in
+carrots) from a source position to a target position.  The first query
+to a target runs Dijkstra's algorithm backward from the target over the
+whole maze and keeps the resulting shortest path tree: for every
+position, the carrots to the target and the next move towards it.  The
+later queries to the same target walk down the tree without searching.
+The most recently used trees are kept, up to a given number.
+
+Usage:  path_server.py maze_file [options]
+Reads one query per line, four integers x1 y1 x2 y2 for the path from
+(x1, y1) to (x2, y2), and writes one answer per line: the carrots and
+the actions, or None if there is no path.
+
+Options:
+    -q (--queries): the name of the query file (defaults to the
+        keyboard, so the server answers the queries as they come)
+    -r (--random): answer the given number of random queries to the
+        medals instead, check them and compare the time with loading
+        the maze and searching again for each query
+    -z (--capacity): the number of shortest path trees kept
+    -s (--seed): the seed of the random number generator
+    -k (--cache): the directory of the parsed maze cache
+
+Example:  path_server.py questG.txt -r 10000 -z 16
+"""
+import argparse
+import collections
+import random
+import sys
+import time
+import spartanquest
+
+# The default number of shortest path trees kept by a server
+CAPACITY = 64
+
+
+class PathServer(object):
+    """
+    Answer shortest carrot path queries on the maze of a quest.
+
+    Arguments:
+    problem (a Problem object): the quest whose maze is searched - only
+        the maze and the move costs are used
+    capacity (int): the number of shortest path trees kept - defaults
+        to CAPACITY.  The least recently used tree is dropped to make
+        room for a new one.
+
+    Attributes:
+    problem (a Problem object): the quest whose maze is searched
+    capacity (int): the number of shortest path trees kept
+    hits (int): the number of queries answered with a saved tree
+    misses (int): the number of trees built
+    evictions (int): the number of trees dropped
+    """
+
+    def __init__(self, problem, capacity=CAPACITY):
+        if capacity < 1:
+            raise ValueError('the server must keep at least one tree')
+        self.problem = problem
+        self.capacity = capacity
+        self.hits = self.misses = self.evictions = 0
+        self._trees = collections.OrderedDict()  # private variable
+        self._actions = list(problem.moves)  # private variable
+
+    def query(self, source, target):
+        """
+        Find the cheapest path from the source to the target position.
+        :param
+        source: tuple (x, y) representing a maze position
+        target: tuple (x, y) representing a maze position
+        :return: tuple (carrots, list of actions) or None if the target
+                cannot be reached from the source
+        """
+        maze = self.problem.maze
+        self._check(source)
+        distances, next_index, next_action = self.tree(target)
+        index = maze.index(source)
+        carrots = distances[index]
+        if carrots == float('inf'):
+            return None
+        target_index = maze.index(target)
+        actions = self._actions
+        solution = []
+        while index != target_index:
+            solution.append(actions[next_action[index]])
+            index = next_index[index]
+        return int(carrots), solution
+
+    def query_batch(self, queries):
+        """
+        Answer a list of queries, grouped by target so that each tree is
+        built at most once for the batch even when the batch uses more
+        targets than the server keeps trees.
+        :param queries: iterable of (source, target) position pairs
+        :return: list of the answers (see query), in the order of the
+                queries
+        """
+        queries = list(queries)
+        by_target = collections.defaultdict(list)
+        for number, (source, target) in enumerate(queries):
+            by_target[target].append(number)
+        answers = [None] * len(queries)
+        for target, numbers in by_target.items():
+            for number in numbers:
+                answers[number] = self.query(queries[number][0], target)
+        return answers
+
+    def tree(self, target):
+        """
+        Return the shortest path tree to the target position, building
+        it if it is not saved (see Problem.distances_to).
+        :param target: tuple (x, y) representing a maze position
+        :return: tuple of three arrays indexed by maze position index:
+            the carrots to the target (float('inf') if it cannot be
+            reached), the index of the next position on the path and
+            the number of the next action (in the order of
+            Problem.moves)
+        """
+        trees = self._trees
+        tree = trees.get(target)
+        if tree is not None:
+            trees.move_to_end(target)
+            self.hits += 1
+            return tree
+        self._check(target)
+        tree = trees[target] = self.problem.distances_to(target, True)
+        self.problem.record('path_trees', 1)
+        self.misses += 1
+        if len(trees) > self.capacity:
+            trees.popitem(last=False)
+            self.evictions += 1
+        return tree
+
+    def clear(self):
+        """
+        Drop the saved trees - needed after the walls change.
+        :return: None
+        """
+        self._trees.clear()
+
+    def _check(self, position):
+        """
+        Make sure a position can be part of a path.
+        This is a private method.
+        :param position: tuple (x, y) representing a maze position
+        :return: None
+        """
+        maze = self.problem.maze
+        if not maze.within_bounds(position) or maze.is_wall(position):
+            raise ValueError(f'{position} is not a vacant maze position')
+
+
+def parse_query(line):
+    """
+    Parse a query line.
+    :param line: (string) four integers x1 y1 x2 y2
+    :return: tuple (source, target) of (x, y) positions
+    """
+    x1, y1, x2, y2 = (int(word) for word in line.split())
+    return (x1, y1), (x2, y2)
+
+
+def format_answer(answer):
+    """
+    Format the answer to a query.
+    :param answer: tuple (carrots, list of actions) or None
+    :return: (string) the carrots followed by the actions, or None
+    """
+    if answer is None:
+        return 'None'
+    carrots, actions = answer
+    return f'{carrots} {"".join(actions)}'
+
+
+def serve(server, lines, output):
+    """
+    Answer the queries one line at a time.
+    :param
+    server (a PathServer object): the server answering the queries
+    lines (iterable of strings): the query lines - blank lines are
+        skipped
+    output (file object): the file the answers are written to
+    :return: None
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            answer = format_answer(server.query(*parse_query(line)))
+        except ValueError as error:
+            answer = f'Error: {error}'
+        output.write(answer + '\n')
+        output.flush()
+
+
+def random_queries(maze_name, server, count, generator):
+    """
+    Answer random queries from vacant positions to the medals, then
+    answer the first of them again the way separate spartanquest runs
+    would: loading the maze and searching from scratch for each query.
+    :param
+    maze_name (string): the name of the maze file of the server
+    server (a PathServer object): the server answering the queries
+    count (int): the number of queries
+    generator (random.Random): the random number generator
+    :return: None
+    """
+    quest = server.problem
+    maze = quest.maze
+    vacant = [maze.position(index) for index in range(maze.width * maze.height)
+              if not maze.walls[index]]
+    targets = sorted(quest.medals) or vacant
+    queries = [(generator.choice(vacant), generator.choice(targets))
+               for each in range(count)]
+    start_time = time.perf_counter()
+    answers = server.query_batch(queries)
+    server_time = time.perf_counter() - start_time
+    print(f'{count:,} queries answered in {server_time:.4f}(sec) with '
+          f'{server.misses:,} trees built')
+    sample = list(zip(queries, answers))[:100]
+    start_time = time.perf_counter()
+    for (source, target), answer in sample:
+        with open(maze_name) as maze_file:
+            single = spartanquest.Problem(maze_file)
+        carrots = single.distances_to(target)[maze.index(source)]
+        if answer is None and carrots != float('inf') or \
+                answer is not None and (carrots != answer[0] or
+                                        quest.path_cost(answer[1]) != carrots):
+            print(f'Wrong answer from {source} to {target}!')
+    single_time = (time.perf_counter() - start_time) / len(sample) * count
+    print(f'{count:,} separate runs would take {single_time:.4f}(sec) '
+          f'(estimated from {len(sample)})')
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the maze file and the options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('maze_file',
+                        help='name of the text file containing the maze info',
+                        type=argparse.FileType('r'))
+    parser.add_argument('-q', '--queries',
+                        help='name of the query file',
+                        type=argparse.FileType('r'),
+                        default=sys.stdin)
+    parser.add_argument('-r', '--random',
+                        help='number of random queries to the medals',
+                        type=int,
+                        default=None)
+    parser.add_argument('-z', '--capacity',
+                        help='number of shortest path trees kept',
+                        type=int,
+                        default=CAPACITY)
+    parser.add_argument('-s', '--seed',
+                        help='seed of the random number generator',
+                        type=int,
+                        default=0)
+    parser.add_argument('-k', '--cache',
+                        help='cache the parsed maze in DIR',
+                        metavar='DIR',
+                        nargs='?',
+                        const=spartanquest.CACHE_DIR,
+                        default=None)
+    arguments = parser.parse_args()
+    if arguments.capacity < 1:
+        parser.error('the capacity must be at least 1')
+    if arguments.random is not None and arguments.random < 1:
+        parser.error('the number of random queries must be at least 1')
+    return arguments
+
+
+def main():
+    arguments = get_arguments()
+    quest = spartanquest.Problem(arguments.maze_file,
+                                 cache_dir=arguments.cache)
+    server = PathServer(quest, arguments.capacity)
+    if arguments.random is None:
+        serve(server, arguments.queries, sys.stdout)
+    else:
+        random_queries(arguments.maze_file.name, server, arguments.random,
+                       random.Random(arguments.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+# ----------------------------------------------------------------------
+# Name:     portfolio
+# Purpose:  Run a portfolio of search algorithms on a set of quests
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Batch runner for the spartanquest search algorithms
+
+Usage:  portfolio.py maze_file [maze_file ...] [options]
+Every search is run on every maze file, each job in its own process
+and without the graphics display.  The searches are specified as
+algorithm or algorithm:heuristic, for example bfs or astar:gen_heuristic.
+By default we run dfs, bfs, ucs and astar with each heuristic.
+
+Options:
+    -s (--searches): the searches to run
+    -w (--workers): the number of jobs to run in parallel
+    -t (--timeout): the number of seconds after which a job is stopped
+    -l (--memory-limit): the memory (MiB) a job may use (Unix only)
+    -o (--output): the .csv or .json file for the results table
+    -k (--cache): cache the parsed mazes (see spartanquest.py)
+
+Example:  portfolio.py quest*.txt -s bfs ucs astar:mst_heuristic -t 60
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import tracemalloc
+import informed_search
+import spartanquest
+
+try:
+    import resource  # only available on Unix
+except ImportError:
+    resource = None
+
+# The columns of the results table
+FIELDS = ['maze', 'algorithm', 'heuristic', 'status', 'path_length',
+          'carrots', 'nodes_expanded', 'wall_time', 'peak_memory',
+          'search_memory']
+
+
+def default_searches():
+    """
+    Return the default portfolio: dfs, bfs, ucs and astar with each
+    heuristic defined in informed_search.
+    :return: list of (algorithm, heuristic) tuples
+    """
+    heuristics = sorted(name for name in dir(informed_search)
+                        if name.endswith('_heuristic'))
+    return [('dfs', None), ('bfs', None), ('ucs', None)] + \
+           [('astar', heuristic) for heuristic in heuristics]
+
+
+def parse_search(search):
+    """
+    Split a search specification into its algorithm and heuristic.
+    :param search: (string) algorithm or algorithm:heuristic
+    :return: (tuple) the algorithm and the heuristic (None if omitted)
+    """
+    algorithm, separator, heuristic = search.partition(':')
+    if algorithm not in spartanquest.INFORMED + spartanquest.UNINFORMED:
+        raise argparse.ArgumentTypeError(f'unknown algorithm {algorithm}')
+    if heuristic and not hasattr(informed_search, heuristic):
+        raise argparse.ArgumentTypeError(f'unknown heuristic {heuristic}')
+    return algorithm, heuristic or None
+
+
+def run_job(connection, maze_file, algorithm, heuristic, memory_limit,
+            cache_dir=None, trace_memory=False):
+    """
+    Run one search and send its statistics through the connection.
+    Runs in its own process.
+    :param
+    connection: the child end of a multiprocessing Pipe
+    maze_file (string): the name of the maze file
+    algorithm (string): the name of the search algorithm
+    heuristic (string): the name of the heuristic or None
+    memory_limit (int): the maximum memory in bytes or None
+    cache_dir (string): the directory of the parsed maze cache or None
+    trace_memory (Boolean): True to also measure the peak memory
+        allocated by the search itself with tracemalloc, which slows
+        the search down
+    :return: None
+    """
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    result = {}
+    try:
+        with open(maze_file) as file:
+            quest = spartanquest.Problem(file, cache_dir=cache_dir)
+        if trace_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        solution = spartanquest.run_search(quest, algorithm,
+                                           heuristic or 'null_heuristic')
+        result['wall_time'] = time.perf_counter() - start_time
+        if trace_memory:
+            # the peak memory allocated by the search in KiB
+            result['search_memory'] = \
+                tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        result['nodes_expanded'] = quest.nodes_expanded()
+        if solution is None:
+            result['status'] = 'failed'
+        else:
+            result['status'] = 'solved'
+            result['path_length'] = len(solution)
+            result['carrots'] = quest.path_cost(solution)
+        if resource is not None:
+            # the peak resident memory of the process in KiB (Linux),
+            # which includes the interpreter and the memory of the
+            # parent process at the time of the fork
+            result['peak_memory'] = resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss
+    except MemoryError:
+        result = {'status': 'memory'}
+    except Exception as error:
+        result = {'status': f'error: {error}'}
+    connection.send(result)
+    connection.close()
+
+
+def run_portfolio(maze_files, searches, workers=None, timeout=None,
+                  memory_limit=None, cache_dir=None, trace_memory=False):
+    """
+    Run every search on every maze file in a pool of processes.
+    A job that runs longer than the timeout is terminated.
+    :param
+    maze_files (list of strings): the names of the maze files
+    searches (list of tuples): the (algorithm, heuristic) pairs to run
+    workers (int): the number of jobs to run at once - defaults to the
+        number of CPUs
+    timeout (float): the number of seconds allowed per job - defaults
+        to no limit
+    memory_limit (int): the number of MiB allowed per job - defaults to
+        no limit
+    cache_dir (string): the directory of the parsed maze cache -
+        defaults to None (no cache)
+    trace_memory (Boolean): True to measure the peak memory of each
+        search with tracemalloc (the search_memory column) - defaults
+        to False
+    :return: list of dictionaries, one row of FIELDS per job, in the
+        order of the jobs
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = memory_limit * 1024 * 1024 if memory_limit else None
+    jobs = [(maze_file, algorithm, heuristic) for maze_file in maze_files
+            for algorithm, heuristic in searches]
+    results = [None] * len(jobs)
+    waiting = list(range(len(jobs)))
+    waiting.reverse()
+    running = {}  # maps a process sentinel to its job information
+    while waiting or running:
+        while waiting and len(running) < workers:
+            job = waiting.pop()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=run_job,
+                                              args=(sender, *jobs[job], limit,
+                                                    cache_dir, trace_memory))
+            process.start()
+            sender.close()
+            running[process.sentinel] = (job, process, receiver,
+                                         time.perf_counter())
+        if timeout is None:
+            wait_time = None
+        else:
+            now = time.perf_counter()
+            wait_time = max(0, min(start + timeout - now for job, process,
+                                   receiver, start in running.values()))
+        # watch the pipes too: a process that sends a large result only
+        # exits once the result has been read
+        receivers = {information[2]: sentinel
+                     for sentinel, information in running.items()}
+        ready = multiprocessing.connection.wait(
+            list(running) + list(receivers), wait_time)
+        finished = {receivers.get(each, each) for each in ready}
+        for sentinel, (job, process, receiver, start) in list(running.items()):
+            if sentinel in finished:
+                try:
+                    result = receiver.recv()
+                except EOFError:  # the process died without a result
+                    result = {'status': 'error: crashed'}
+                process.join()
+            elif timeout is not None and \
+                    time.perf_counter() - start >= timeout:
+                process.terminate()
+                process.join()
+                result = {'status': 'timeout', 'wall_time': timeout}
+            else:
+                continue
+            receiver.close()
+            del running[sentinel]
+            maze_file, algorithm, heuristic = jobs[job]
+            results[job] = {field: '' for field in FIELDS}
+            results[job].update(maze=maze_file, algorithm=algorithm,
+                                heuristic=heuristic or '', **result)
+    return results
+
+
+def write_results(results, output):
+    """
+    Write the results table as CSV or JSON, depending on the extension
+    of the output file name.
+    :param
+    results (list of dictionaries): the rows of the table
+    output (string): the name of the output file
+    :return: None
+    """
+    with open(output, 'w', newline='') as file:
+        if output.endswith('.json'):
+            json.dump(results, file, indent=2)
+        else:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def print_results(results):
+    """
+    Print the results table.
+    :param results: (list of dictionaries) the rows of the table
+    :return: None
+    """
+    print(f'{"maze":<12}{"search":<34}{"status":<10}{"length":>7}'
+          f'{"carrots":>9}{"expanded":>12}{"time":>10}{"MiB":>8}')
+    for row in results:
+        search = row['algorithm']
+        if row['heuristic']:
+            search += ':' + row['heuristic']
+        wall_time = f'{row["wall_time"]:.4f}' if row['wall_time'] != '' \
+            else ''
+        nodes = f'{row["nodes_expanded"]:,}' if row['nodes_expanded'] != '' \
+            else ''
+        memory = f'{row["peak_memory"] / 1024:.1f}' \
+            if row['peak_memory'] != '' else ''
+        print(f'{row["maze"]:<12}{search:<34}{row["status"]:<10}'
+              f'{row["path_length"]:>7}{row["carrots"]:>9}{nodes:>12}'
+              f'{wall_time:>10}{memory:>8}')
+
+
+def get_arguments():
+    """
+    Parse and validate the command line arguments
+    :return: (argparse.Namespace) the maze files and the options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('maze_files',
+                        help='names of the text files containing the mazes',
+                        nargs='+')
+    parser.add_argument('-s', '--searches',
+                        help='algorithm or algorithm:heuristic to run',
+                        nargs='+',
+                        type=parse_search,
+                        default=None)
+    parser.add_argument('-w', '--workers',
+                        help='number of jobs to run in parallel',
+                        type=int,
+                        default=None)
+    parser.add_argument('-t', '--timeout',
+                        help='seconds allowed per job',
+                        type=float,
+                        default=None)
+    parser.add_argument('-l', '--memory-limit',
+                        help='MiB of memory allowed per job',
+                        type=int,
+                        default=None)
+    parser.add_argument('-o', '--output',
+                        help='.csv or .json file for the results table',
+                        default=None)
+    parser.add_argument('-k', '--cache',
+                        help='cache the parsed mazes in DIR',
+                        metavar='DIR',
+                        nargs='?',
+                        const=spartanquest.CACHE_DIR,
+                        default=None)
+    return parser.parse_args()
+
+
+def main():
+    arguments = get_arguments()
+    searches = arguments.searches or default_searches()
+    results = run_portfolio(arguments.maze_files, searches,
+                            arguments.workers, arguments.timeout,
+                            arguments.memory_limit, arguments.cache)
+    print_results(results)
+    if arguments.output:
+        write_results(results, arguments.output)
+
+
+if __name__ == '__main__':
+    main()
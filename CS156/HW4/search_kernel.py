@@ -0,0 +1,267 @@
+# ----------------------------------------------------------------------
+# Name:     search_kernel
+# Purpose:  The graph search loop shared by the search algorithms
+#
+# Author(s): Athena Nguyen & John Paul Tran
+# ----------------------------------------------------------------------
+"""
+Best first graph search kernel
+
+dfs, bfs, ucs, astar and weighted_astar differ only in their fringe and
+in the priority of the nodes they push: they all call
+best_first_search with a Stack, a Queue or a PriorityQueue and a
+priority function.  An optimization of the search loop is made once,
+here, and every algorithm gets it.
+
+best_first_events runs the same search as a generator that yields an
+Expansion event for each state expanded, so a display or a monitor can
+follow the search while it runs and stop it at any point.  follow runs
+such a generator with a callback and a time budget.
+
+The loop of best_first_search works on the list, deque or heap inside
+the fringe and on the arrays of the NodeStore directly, instead of
+calling their methods for every node, and updates the fringe counters
+once at the end.  Any other fringe with push, pop and __len__ methods
+works too, through its methods.
+"""
+import collections
+import heapq
+import time
+import data_structures
+
+# The event yielded for each state expanded:
+#   state: the state expanded
+#   g: the cumulative cost from the root to the state
+#   f: the priority of the state in the fringe (None for the fringes
+#      without priorities)
+#   fringe_size: the number of nodes in the fringe after the expansion
+Expansion = collections.namedtuple('Expansion', 'state g f fringe_size')
+
+
+def cumulative_cost(state, cost):
+    """
+    Priority function of uniform cost search: the cumulative cost from
+    the root.  best_first_search recognizes it and pushes the cost
+    without calling it.
+    :param
+    state: the problem state of the node
+    cost (number): the cumulative cost from the root to the node
+    :return: (number) the cumulative cost
+    """
+    return cost
+
+
+def best_first_search(problem, fringe, priority=None, stats=None):
+    """
+    Graph search algorithm shared by the search algorithms
+    Pops the nodes from the fringe in the order the fringe gives them,
+    skips the states already explored and stops at the first goal state
+    popped.  The children whose state is already explored are neither
+    added to the search tree nor pushed: they could only be popped as
+    duplicates, and the search tree keeps every node it is given.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    fringe (an empty Stack, Queue or PriorityQueue) the frontier strategy
+    priority (a function) maps a child state and its cumulative cost to
+            its priority in the fringe - defaults to None for the fringes
+            without priorities (Stack and Queue)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    closed = set()  # keep track of our explored states
+    expand = problem.expand
+    if stats is not None:
+        stats.watch(fringe, closed)
+        expand = stats.timed_expand(expand)
+    is_goal = problem.is_goal
+    explore = closed.add
+    nodes = data_structures.NodeStore()  # the search tree
+    root = nodes.add(problem.start_state(), None, None)
+    ordered = priority is not None
+    if ordered:
+        fringe.push(root, 0)  # cumulative cost is the priority from root
+    else:
+        fringe.push(root)
+    # the node store arrays, appended to directly for the actions it
+    # already has a code for
+    states, parents, costs = nodes.states, nodes.parents, nodes.costs
+    codes = nodes.codes
+    add_state, add_parent, add_cost = \
+        states.append, parents.append, costs.append
+    add_code = nodes.action_codes.append
+    # the fringe container and its counters
+    fringe_type = type(fringe)
+    if fringe_type is data_structures.PriorityQueue:
+        items = fringe.heap
+        heappush, heappop = heapq.heappush, heapq.heappop
+        pop = None
+    elif fringe_type is data_structures.Stack:
+        items = fringe.list
+        push, pop = items.append, items.pop
+    elif fringe_type is data_structures.Queue:
+        items = fringe.deque
+        push, pop = items.append, items.popleft
+    else:  # any other fringe: through its methods
+        items = None
+        push, pop = fringe.push, fringe.pop
+    if items is None:
+        remaining = fringe
+        count = peak_size = 0  # kept by the fringe itself
+    else:
+        remaining = items
+        count, peak_size = fringe.count, fringe.peak_size
+    by_cost = priority is cumulative_cost
+    solution = None
+    try:
+        while remaining:
+            node = heappop(items)[2] if pop is None else pop()
+            state = states[node]
+            states[node] = None  # only keep the states on the fringe
+            if is_goal(state):
+                solution = nodes.solution(node)  # we found a solution
+                break
+            if state in closed:  # we are implementing graph search
+                if stats is not None:
+                    stats.duplicates += 1
+                continue
+            explore(state)
+            cost = costs[node]
+            for child_state, action, action_cost in expand(state):
+                if child_state in closed:
+                    continue  # it would only be popped as a duplicate
+                child_cost = cost + action_cost
+                code = codes.get(action)
+                if code is None:  # a new action: let the store code it
+                    child_node = nodes.add(child_state, node, action,
+                                           child_cost)
+                    add_code = nodes.action_codes.append
+                    costs = nodes.costs  # in case add widened it
+                    add_cost = costs.append
+                else:
+                    child_node = len(states)
+                    try:
+                        add_cost(child_cost)
+                    except TypeError:  # the first cost that is not an int
+                        nodes.widen_costs()
+                        costs = nodes.costs
+                        add_cost = costs.append
+                        add_cost(child_cost)
+                    add_state(child_state)
+                    add_parent(node)
+                    add_code(code)
+                if not ordered:
+                    push(child_node)
+                elif pop is None:
+                    heappush(items, (child_cost if by_cost
+                                     else priority(child_state, child_cost),
+                                     count, child_node))
+                else:
+                    push(child_node, priority(child_state, child_cost))
+                count += 1
+            if items is not None and len(items) > peak_size:
+                peak_size = len(items)
+    finally:
+        if items is not None:
+            fringe.count = count
+            fringe.peak_size = peak_size
+        if stats is not None:
+            stats.finish()
+    return solution
+
+
+def best_first_events(problem, fringe, priority=None, stats=None):
+    """
+    Graph search algorithm of best_first_search as a generator
+    Yields an Expansion event after each state is expanded and returns
+    the solution when the search ends.  Nothing is computed until the
+    next event is asked for, so the caller can stop the search at any
+    point by no longer iterating (or by closing the generator).
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py
+    fringe (an empty Stack, Queue or PriorityQueue) the frontier strategy
+    priority (a function) maps a child state and its cumulative cost to
+            its priority in the fringe - defaults to None for the fringes
+            without priorities (Stack and Queue)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: generator yielding Expansion events.  Its return value
+            (the value of the StopIteration exception, see follow) is
+            the list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    closed = set()  # keep track of our explored states
+    expand = problem.expand
+    if stats is not None:
+        stats.watch(fringe, closed)
+        expand = stats.timed_expand(expand)
+    ordered = priority is not None
+    nodes = data_structures.NodeStore()  # the search tree
+    priorities = []  # the priority of each node, ints kept as ints
+    root = nodes.add(problem.start_state(), None, None)
+    priorities.append(0)
+    if ordered:
+        fringe.push(root, 0)  # cumulative cost is the priority from root
+    else:
+        fringe.push(root)
+    try:
+        while not fringe.is_empty():
+            node = fringe.pop()
+            state = nodes.pop_state(node)
+            if problem.is_goal(state):
+                return nodes.solution(node)  # we found a solution
+            if state not in closed:  # we are implementing graph search
+                closed.add(state)
+                cost = nodes.cumulative_cost(node)
+                for child_state, action, action_cost in expand(state):
+                    if child_state in closed:
+                        continue  # it would only be popped as a duplicate
+                    child_cost = cost + action_cost
+                    child_node = nodes.add(child_state, node, action,
+                                           child_cost)
+                    if ordered:
+                        child_priority = priority(child_state, child_cost)
+                        priorities.append(child_priority)
+                        fringe.push(child_node, child_priority)
+                    else:
+                        priorities.append(0)
+                        fringe.push(child_node)
+                yield Expansion(state, cost,
+                                priorities[node] if ordered else None,
+                                len(fringe))
+            elif stats is not None:
+                stats.duplicates += 1
+    finally:  # the search ends here, or is closed at a yield
+        if stats is not None:
+            stats.finish()
+    return None  # Failure -  no solution was found
+
+
+def follow(events, on_event=None, time_budget=None):
+    """
+    Run a search generator (see best_first_events) to its end, or until
+    the time budget has passed.
+    :param
+    events (generator) yielding events and returning the solution
+    on_event (function) called with each event - defaults to None
+    time_budget (float) the number of seconds after which the search is
+            stopped - defaults to no limit
+    :return: tuple (solution, finished): the solution returned by the
+            search (None if there is none or the search was stopped)
+            and False if the search was stopped, True otherwise
+    """
+    deadline = None if time_budget is None \
+        else time.perf_counter() + time_budget
+    try:
+        while True:
+            event = next(events)
+            if on_event is not None:
+                on_event(event)
+            if deadline is not None and time.perf_counter() >= deadline:
+                events.close()
+                return None, False
+    except StopIteration as end:
+        return end.value, True
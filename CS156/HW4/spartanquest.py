@@ -14,12 +14,71 @@ The maze_file is a text file such as SJSU.txt
 The search_algorithm in homework 3 is:
     dfs: for depth first search
     bfs: for breadth first search
+    bfs_early: for breadth first search with an early goal test
     ucs for uniform cost search
 The search_algorithm in homework 4 is:
     astar: for A*  search
+    astar_indexed: for A* search that never queues dominated duplicates
+    bidirectional: for bidirectional A* search on single medal quests
+                   (only faster than astar with null_heuristic)
+    idastar: for iterative deepening A* search
+    jps_astar: for A* search with jump point search (only when every
+               move costs the same, otherwise it runs astar)
+    weighted_astar: for weighted A* search (bounded suboptimal)
+    anytime_astar: for anytime repairing A* search
+    medal_tour: for the best medal order by dynamic programming (few
+                medals, large mazes - the heuristic is ignored)
 
 Example:  spartanquest.py SJSU.txt dfs
 
+Add the -c (--compact) option to represent each search state as a
+single int holding Sammy's position index and a bitmask of the
+remaining medals, instead of a tuple of tuples.
+Example:  spartanquest.py questG.txt astar gen_heuristic --compact
+
+idastar prunes the states it already reached at no higher cost with
+a transposition table.  Add the -T (--no-transposition) option to
+search without the table, which only suits state spaces with few
+transpositions (not the mazes: there idastar may never finish).  Add
+the -m (--memory) option to report the peak memory used by the search
+(measured with tracemalloc, which slows the search down).
+Example:  spartanquest.py questH.txt idastar mst_heuristic -m
+
+Use the -w (--weight) option to set the heuristic weight of
+weighted_astar and the initial weight of anytime_astar, and the
+-b (--time-budget) option to stop anytime_astar with the best solution
+found once the given number of seconds has passed.  bfs, ucs and astar
+are stopped without a solution once the time budget has passed.
+Example:  spartanquest.py questG.txt anytime_astar mst_heuristic -w 3 -b 0.5
+
+Use the -l (--live) option with bfs, ucs or astar to watch the search:
+the display shades each position as the search expands it, then moves
+Sammy along the solution.  The statistics are printed once the window
+is closed and the processing time includes the animation.
+Example:  spartanquest.py questD.txt astar gen_heuristic -l
+
+The distance_heuristic and mst_heuristic heuristics look up the carrot
+distances to every medal.  These are computed before the search starts
+and their processing time is reported separately.
+
+Use the -n (--no-display) option to skip the visualization (tkinter is
+then never imported) and the -j (--json) option to print the statistics
+as a single JSON object, for example in benchmark scripts.
+Example:  spartanquest.py questB.txt astar mst_heuristic -n -j
+
+Use the -s (--stats) option with dfs, bfs, bfs_early, ucs or astar to
+report the fringe pushes and pops, the duplicate states popped, the
+peak fringe and explored set sizes and the time spent expanding states
+versus evaluating the heuristic.  Give it a number N to also sample
+the state expanded every N expansions.
+Example:  spartanquest.py questF.txt astar gen_heuristic -n -s 1000
+
+Use the -k (--cache) option to save the parsed maze in a cache
+directory (~/.cache/spartanquest unless a directory is given), keyed
+by the hash of the maze file, so later runs on the same maze skip
+parsing it.
+Example:  spartanquest.py maze2000.txt astar distance_heuristic -n -k
+
 The uninformed search algorithms functions are implemented in the file
 uninformed_search.py.
 
@@ -28,9 +87,53 @@ Your task for homework 4 is to implement astar in informed_search.py.
 """
 import time
 import argparse
+import array
+import collections
+import hashlib
+import heapq
+import json
+import os
+import pickle
+import re
+import tracemalloc
+import data_structures
 import uninformed_search
 import informed_search
-import graphics
+import search_kernel
+
+# The search algorithms that can be specified on the command line
+UNINFORMED = ['dfs', 'bfs', 'bfs_early', 'ucs']
+INFORMED = ['astar', 'astar_indexed', 'bidirectional', 'idastar',
+            'jps_astar', 'weighted_astar', 'anytime_astar', 'medal_tour']
+# The search algorithms that accept a SearchStats object
+INSTRUMENTED = ['dfs', 'bfs', 'bfs_early', 'ucs', 'astar']
+# The search algorithms that can run as generators of expansion events
+STREAMING = ['bfs', 'ucs', 'astar']
+# The heuristics that look up the carrot distances to the medals
+DISTANCE_HEURISTICS = ['distance_heuristic', 'mst_heuristic']
+# The directory where parsed mazes are cached by the --cache option
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'spartanquest')
+# Translation table mapping the wall characters to 1, all others to 0
+WALL_TABLE = bytes(1 if chr(code) in 'Ww' else 0 for code in range(256))
+
+
+class LazyTable(dict):
+    """
+    Represent a table indexed by maze position index whose entries are
+    computed the first time they are looked up.  Large mazes are only
+    partly explored by most searches, so only those entries are built.
+
+    Arguments:
+    compute (function): maps an index to the entry for that index
+    """
+    def __init__(self, compute):
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, index):
+        value = self[index] = self.compute(index)
+        return value
+
 
 class Maze(object):
     """
@@ -43,16 +146,28 @@ class Maze(object):
     Attributes:
     width (int):  the width of the maze
     height (int): the height of the maze
-    walls (two dimensional list of booleans):
-        Each element represents a position in the maze.
-        True indicates that there is a wall in that position.
-        False indicates the absence of a wall.
-        self.walls[x][y] indicates the presence or absence of a wall
-        at position (x, y) in the maze.
+    walls (bytearray): one byte per position in row major order.
+        1 indicates that there is a wall in that position.
+        0 indicates the absence of a wall.
+        self.walls[self.index((x, y))] indicates the presence or
+        absence of a wall at position (x, y) in the maze.
+    neighbors (LazyTable of tuples): set up by build_adjacency.
+        self.neighbors[index] is a tuple of (neighbor index, action,
+        cost) tuples, one for each valid move from the position with
+        that index.  Walls have no neighbors.
+    positions (LazyTable of tuples): set up by build_adjacency.
+        self.positions[index] is the (x, y) position with that index.
+    predecessors (LazyTable of tuples): set up by build_adjacency.
+        self.predecessors[index] is a tuple of (predecessor index,
+        action, cost) tuples, one for each valid move that leads into
+        the position with that index.
+    moves (dictionary): set up by build_adjacency.
+        The (dx, dy) offsets of each action.
     """
-    def __init__(self, width, height):
-        self.walls = [[False for x in range(width)]
-                      for y in range(height)]
+    def __init__(self, width, height, walls=None):
+        if walls is None:
+            walls = bytearray(width * height)
+        self.walls = walls
         self.width = width
         self.height = height
 
@@ -63,7 +178,7 @@ class Maze(object):
         :return: None
         """
         x, y = position
-        self.walls[y][x] = True
+        self.walls[y * self.width + x] = 1
 
     def is_wall(self, position):
         """
@@ -73,7 +188,29 @@ class Maze(object):
         False otherwise
         """
         x, y = position
-        return self.walls[y][x]
+        return self.walls[y * self.width + x] == 1
+
+    def set_wall(self, position, wall=True):
+        """
+        Add or remove a wall in the specified position after the
+        adjacency tables are set up.  The table entries of the position
+        and of the positions next to it are dropped, to be built again
+        with the new wall the next time they are looked up.
+        :param
+        position: tuple (x, y) representing a maze position
+        wall (Boolean): True to add a wall, False to remove it
+        :return: None
+        """
+        index = self.index(position)
+        self.walls[index] = 1 if wall else 0
+        x, y = position
+        changed = [index] + [self.index((x + move_x, y + move_y))
+                             for move_x, move_y in self.moves.values()
+                             if self.within_bounds((x + move_x,
+                                                    y + move_y))]
+        for each in changed:
+            self.neighbors.pop(each, None)
+            self.predecessors.pop(each, None)
 
     def within_bounds(self, position):
         """
@@ -85,6 +222,100 @@ class Maze(object):
         x, y = position
         return (0 <= x <= self.width -1) and (0 <= y <= self.height - 1)
 
+    def index(self, position):
+        """
+        Convert a maze position into its index in row major order
+        :param position: tuple (x, y) representing a maze position
+        :return: (int) the index y * width + x of that position
+        """
+        x, y = position
+        return y * self.width + x
+
+    def position(self, index):
+        """
+        Convert an index in row major order back into a maze position
+        :param index: (int) the index of a maze position
+        :return: tuple (x, y) representing that maze position
+        """
+        y, x = divmod(index, self.width)
+        return x, y
+
+    def build_adjacency(self, moves, cost):
+        """
+        Set up the tables of valid moves from and into every maze
+        position.  The maze does not change during a quest so each
+        entry is built once, the first time it is looked up, and the
+        search looks up the neighbors of a position instead of checking
+        the bounds and the walls for every move.
+        :param
+        moves (dictionary): the (dx, dy) offsets of each action
+        cost (dictionary): the cost of each action
+        :return: None
+        """
+        width, height, walls = self.width, self.height, self.walls
+
+        def moves_from(index):
+            if walls[index]:
+                return ()
+            y, x = divmod(index, width)
+            valid_moves = []
+            for action, (move_x, move_y) in moves.items():
+                new_x, new_y = x + move_x, y + move_y
+                if 0 <= new_x < width and 0 <= new_y < height and \
+                        not walls[new_y * width + new_x]:
+                    valid_moves.append((new_y * width + new_x, action,
+                                        cost[action]))
+            return tuple(valid_moves)
+
+        def moves_into(index):
+            if walls[index]:
+                return ()
+            y, x = divmod(index, width)
+            valid_moves = []
+            for action, (move_x, move_y) in moves.items():
+                old_x, old_y = x - move_x, y - move_y
+                if 0 <= old_x < width and 0 <= old_y < height and \
+                        not walls[old_y * width + old_x]:
+                    valid_moves.append((old_y * width + old_x, action,
+                                        cost[action]))
+            valid_moves.sort(key=lambda move: move[0])
+            return tuple(valid_moves)
+
+        self.moves = moves
+        self.positions = LazyTable(self.position)
+        self.neighbors = LazyTable(moves_from)
+        self.predecessors = LazyTable(moves_into)
+
+
+def parse_maze(text):
+    """
+    Parse the contents of a maze file (see Problem.read_quest).
+    The lines are padded or cut to the width of the maze and joined
+    into one row major string, so the walls, medals and Sammy are found
+    with a translation table and regular expressions instead of a
+    Python loop over the characters.
+    :param text: (string) the contents of the maze file
+    :return: tuple (width, height, walls, medals, mascot):
+        width, height (int): the size of the maze
+        walls (bytes): 1 for each wall position in row major order,
+            0 for the others
+        medals (list of tuples): the (x, y) positions of the medals
+        mascot (tuple): the (x, y) position of Sammy or None
+    """
+    layout = text.splitlines()
+    width = len(layout[0].strip()) # the first line
+    height = len(layout) # the number of lines represents the height
+    grid = ''.join(line[:width].ljust(width) for line in layout)
+    grid = grid.encode('latin-1', 'replace')
+    walls = grid.translate(WALL_TABLE)
+    medals = [(index % width, index // width)
+              for index in (match.start()
+                            for match in re.finditer(b'[Mm]', grid))]
+    mascot = None
+    for match in re.finditer(b'[Ss]', grid):
+        mascot = (match.start() % width, match.start() // width)
+    return width, height, walls, medals, mascot
+
 
 class Problem(object):
     """
@@ -92,6 +323,10 @@ class Problem(object):
 
     Arguments:
     mazefile (file): text file containing the maze info
+    compact (Boolean): True to represent each state as a single int
+        instead of a tuple - defaults to False
+    cache_dir (string): the directory of the parsed maze cache -
+        defaults to None (no cache)
 
     Attributes:
     maze (Maze object):  the maze for this quest
@@ -99,6 +334,11 @@ class Problem(object):
     mascot_position (tuple of integers): the current position of Sammy
     medals (a set of tuples): a set containing the positions of the
     remaining medals in the quest
+    compact (Boolean): True if states use the compact encoding.
+        A compact state holds the index of Sammy's position in its low
+        bits and a bitmask of the remaining medals in its high bits.
+    medal_list (list of tuples): the medal positions in the order of
+        their bits in the compact encoding
     """
     NORTH = "N"
     SOUTH = "S"
@@ -109,12 +349,25 @@ class Problem(object):
     # The cost (number of carrots consumed) associated with each move.
     cost = {EAST: 15, WEST: 1, SOUTH: 2, NORTH: 14}
 
-    def __init__(self, mazefile):
+    # The number of medal subsets whose bounds are kept by medal_bounds
+    BOUNDS_CACHE_SIZE = 4096
+
+    def __init__(self, mazefile, compact=False, cache_dir=None):
         self._nodes_expanded = 0 # private variable
+        self._statistics = {} # private variable
+        self._distances = {} # private variable
+        self._bounds = collections.OrderedDict() # private variable
         self.medals = set()
-        self.read_quest(mazefile)
-
-    def read_quest(self, mazefile):
+        self.compact = compact
+        self.read_quest(mazefile, cache_dir)
+        self.medal_list = sorted(self.medals)
+        # bit layout of the compact encoding (private variables)
+        self._position_bits = (self.maze.width * self.maze.height).bit_length()
+        self._position_mask = (1 << self._position_bits) - 1
+        self._medal_bit = {self.maze.index(medal): 1 << bit
+                           for bit, medal in enumerate(self.medal_list)}
+
+    def read_quest(self, mazefile, cache_dir=None):
         """
         Read the maze file specified and save the information in a Maze
         object.
@@ -126,28 +379,66 @@ class Problem(object):
         M or m: represent the presence of a medal at that position
         S or s: represent the starting position of our mascot Sammy
         Any other character: a vacant maze position
+        With a cache directory, the parsed maze is saved there under
+        the hash of the file contents and loaded from there next time.
+        A cache that cannot be read or written is ignored.
         :param
         mazefile (file object): the file object containing the maze info
+        cache_dir (string): the directory of the parsed maze cache or
+            None to always parse the file
         :return: None
         """
-        layout = mazefile.readlines()
-        width = len(layout[0].strip()) # the first line
-        height = len(layout) # the number of lines represents the height
-        self.maze = Maze(width, height)
-        y = 0
-        for line in layout:
-            x = 0
-            for char in line:
-                if char in {'W', 'w'}: # W represents a wall
-                    self.maze.add_wall((x, y))
-                elif char in {'M', 'm'}: # M represents a medal position
-                    self.add_medal((x, y))
-                elif char in {'S', 's'}: # S represents Sammy's position
-                    self.add_mascot((x, y))
-                x += 1 # anything else is a vacant maze position
-            y += 1
+        text = mazefile.read()
         mazefile.close()
-
+        parsed = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(text.encode('utf-8', 'replace'))
+            cache_file = os.path.join(cache_dir,
+                                      digest.hexdigest() + '.pickle')
+            try:
+                with open(cache_file, 'rb') as file:
+                    parsed = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                parsed = None
+        if parsed is None:
+            parsed = parse_maze(text)
+            if cache_dir is not None:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    temporary_file = f'{cache_file}.{os.getpid()}'
+                    with open(temporary_file, 'wb') as file:
+                        pickle.dump(parsed, file, pickle.HIGHEST_PROTOCOL)
+                    os.replace(temporary_file, cache_file)
+                except OSError:
+                    pass  # carry on without the cache
+        width, height, walls, medals, mascot = parsed
+        self.maze = Maze(width, height, bytearray(walls))
+        for position in medals:
+            self.add_medal(position)
+        if mascot is not None:
+            self.add_mascot(mascot)
+        self.maze.build_adjacency(self.moves, self.cost)
+
+    def set_wall(self, position, wall=True):
+        """
+        Add or remove a wall during the quest.
+        The carrot distances saved by distances_to and the bounds saved
+        by medal_bounds are dropped, since the walls change them.
+        :param
+        position: tuple (x, y) representing a maze position
+        wall (Boolean): True to add a wall, False to remove it
+        :return: None
+        """
+        if not self.maze.within_bounds(position):
+            raise ValueError(f'{position} is outside the maze')
+        if wall and (position == self.mascot_position or
+                     position in self.medals):
+            raise ValueError(f'cannot build a wall on Sammy or a medal '
+                             f'at {position}')
+        self.maze.set_wall(position, wall)
+        self._distances.clear()
+        self._bounds.clear()
+        self.record('wall_edits', 1)
 
     def add_mascot(self, position):
         """
@@ -177,6 +468,8 @@ class Problem(object):
 
         :return: Boolean - True if this is a goal state, False otherwise
         """
+        if self.compact:
+            return not state >> self._position_bits
         position, medals_left = state
         return not medals_left
 
@@ -195,8 +488,47 @@ class Problem(object):
                 the current position (row, column) of Sammy the Spartan
                 a tuple containing the positions of the remaining medals
         """
+        if self.compact:
+            return self.encode_state(self.mascot_position, self.medal_list)
         return self.mascot_position, tuple(self.medals)
 
+    def encode_state(self, position, medals):
+        """
+        Build the state for the given position and remaining medals
+        in the representation used by this problem.
+        :param
+        position: tuple (x, y) - the position of Sammy the Spartan
+        medals: iterable containing the positions of the remaining medals
+        :return:
+        state - an int if the problem uses the compact encoding,
+                a tuple (position, tuple of medals) otherwise
+        """
+        if not self.compact:
+            return position, tuple(medals)
+        medal_mask = 0
+        for medal in medals:
+            medal_mask |= self._medal_bit[self.maze.index(medal)]
+        return (medal_mask << self._position_bits) | self.maze.index(position)
+
+    def decode_state(self, state):
+        """
+        Return the tuple form of the given state regardless of the
+        representation used by this problem.
+        :param
+        state - A state in the representation used by this problem
+        :return:
+        a tuple containing two tuples:
+                the current position (x, y) of Sammy the Spartan
+                a tuple containing the positions of the remaining medals
+        """
+        if not self.compact:
+            return state
+        position = self.maze.position(state & self._position_mask)
+        medal_mask = state >> self._position_bits
+        medals = tuple(medal for bit, medal in enumerate(self.medal_list)
+                       if medal_mask >> bit & 1)
+        return position, medals
+
     def expand(self, state):
         """
         Return a list of tuples representing all states reachable
@@ -209,21 +541,169 @@ class Problem(object):
         a list of tuples representing all states that are reachable
         from the current state with their corresponding action and cost
         """
+        if self.compact:
+            return self._expand_compact(state)
         result = []
         self._nodes_expanded += 1 # update private variable
         position, current_medals = state
-        current_x, current_y = position
-        for action in self.moves:
-            new_position = (current_x + self.moves[action][0],
-                            current_y + self.moves[action][1])
-            # if the move in that direction is valid
-            if self.maze.within_bounds(new_position) and \
-                not self.maze.is_wall(new_position):
-                new_medals = set(current_medals) - {new_position}
-                new_state = (new_position, tuple(new_medals))
-                result.append((new_state, action, self.cost[action]))
+        positions = self.maze.positions
+        for new_index, action, cost in \
+                self.maze.neighbors[self.maze.index(position)]:
+            new_position = positions[new_index]
+            if new_position in current_medals:
+                # keep the remaining medals in their original order
+                new_medals = tuple(medal for medal in current_medals
+                                   if medal != new_position)
+            else:
+                new_medals = current_medals
+            result.append(((new_position, new_medals), action, cost))
         return result
 
+    def _expand_compact(self, state):
+        """
+        Compact encoding version of expand.
+        This is a private method.  Please use expand instead.
+        :param
+        state - (int) a state in the compact encoding
+        :return:
+        a list of tuples representing all states that are reachable
+        from the current state with their corresponding action and cost
+        """
+        result = []
+        self._nodes_expanded += 1 # update private variable
+        bits = self._position_bits
+        index = state & self._position_mask
+        medal_mask = state >> bits
+        medals_part = state - index # the medal bits left in place
+        medal_bit = self._medal_bit
+        for new_index, action, cost in self.maze.neighbors[index]:
+            bit = medal_bit.get(new_index, 0)
+            if medal_mask & bit:
+                new_state = ((medal_mask & ~bit) << bits) | new_index
+            else:
+                new_state = medals_part | new_index
+            result.append((new_state, action, cost))
+        return result
+
+    def successors(self, index):
+        """
+        Return the valid moves out of a maze position, ignoring medals.
+        Used by the search algorithms that work on maze positions rather
+        than on full states.  Counts as a node expansion.
+        :param
+        index (int): the index of the maze position
+        :return:
+        a tuple of (neighbor index, action, cost) tuples
+        """
+        self._nodes_expanded += 1 # update private variable
+        return self.maze.neighbors[index]
+
+    def predecessors(self, index):
+        """
+        Return the valid moves into a maze position, ignoring medals.
+        Used to search backward from a maze position.  Counts as a node
+        expansion.
+        :param
+        index (int): the index of the maze position
+        :return:
+        a tuple of (predecessor index, action, cost) tuples where the
+        action and the cost are those of the move from the predecessor
+        """
+        self._nodes_expanded += 1 # update private variable
+        return self.maze.predecessors[index]
+
+    def distances_to(self, position, next_moves=False, counted=False):
+        """
+        Return the number of carrots consumed on the cheapest path from
+        every maze position to the given position, taking the walls and
+        the cost of each move into account.
+        The carrots are computed once per position with Dijkstra's
+        algorithm, run backward from the position over the moves into
+        each maze position, and saved for later calls.
+        With next_moves, the same search also records the first move of
+        the cheapest path from every position, which gives the whole
+        shortest path tree to the position.  The tree is not saved: the
+        caller decides how many trees to keep (see path_server.py).
+        With counted, each position the search pops counts as a node
+        expansion, for the search algorithms that are made of these
+        searches (see informed_search.medal_tour).  Carrots already
+        saved cost nothing and count nothing.
+        :param
+        position: tuple (x, y) representing a maze position
+        next_moves (Boolean): True to also return the first move of the
+            cheapest path from every position - defaults to False
+        counted (Boolean): True to count the positions popped as node
+            expansions - defaults to False
+        :return:
+        array of floats indexed by maze position index, where
+        float('inf') marks the positions that cannot reach the position.
+        With next_moves, a tuple of three arrays indexed by maze
+        position index: these carrots, the index of the next position
+        on the cheapest path (-1 if there is none) and the number of the
+        action of the next move (in the order of Problem.moves)
+        """
+        distances = None if next_moves else self._distances.get(position)
+        if distances is not None:
+            return distances
+        maze = self.maze
+        size = maze.width * maze.height
+        distances = array.array('d', [float('inf')]) * size
+        if next_moves:
+            next_index = array.array('i', [-1]) * size
+            next_action = array.array('B', [0]) * size
+            codes = {action: code for code, action in enumerate(self.moves)}
+        predecessors = self.predecessors if counted \
+            else maze.predecessors.__getitem__
+        target = maze.index(position)
+        distances[target] = 0
+        fringe = [(0, target)]
+        while fringe:
+            distance, index = heapq.heappop(fringe)
+            if distance > distances[index]:
+                continue  # stale fringe entry
+            for previous, action, action_cost in predecessors(index):
+                new_distance = distance + action_cost
+                if new_distance < distances[previous]:
+                    distances[previous] = new_distance
+                    if next_moves:
+                        next_index[previous] = index
+                        next_action[previous] = codes[action]
+                    heapq.heappush(fringe, (new_distance, previous))
+        if next_moves:
+            return distances, next_index, next_action
+        self._distances[position] = distances
+        self.record('distance_tables', 1)
+        return distances
+
+    def medal_bounds(self, medals, compute):
+        """
+        Return the bounds that compute(self, medals) returns for the
+        given remaining medals.
+        Many states share the same remaining medals, so the bounds of
+        the BOUNDS_CACHE_SIZE most recently used medal tuples are kept
+        in an LRU cache that lives (and dies) with this problem.
+        :param
+        medals: a tuple containing the positions of the remaining medals
+        compute (function): maps the problem and the medals to the bounds
+            (see informed_search.medal_path_bounds)
+        :return: the bounds computed for these medals
+        """
+        bounds = self._bounds
+        if medals in bounds:
+            bounds.move_to_end(medals)
+            return bounds[medals]
+        value = bounds[medals] = compute(self, medals)
+        if len(bounds) > self.BOUNDS_CACHE_SIZE:
+            bounds.popitem(last=False)
+        return value
+
+    def precompute_distances(self):
+        """
+        Compute the distances to every medal ahead of the search.
+        :return: None
+        """
+        for medal in self.medal_list:
+            self.distances_to(medal)
 
     def path_cost(self, actions):
         """
@@ -237,55 +717,302 @@ class Problem(object):
     def nodes_expanded(self):
         return self._nodes_expanded
 
+    def record(self, name, value):
+        """
+        Add the given value to the named search statistic.
+        The search algorithms use it to report their own counters.
+        :param
+        name (string): the name of the statistic
+        value (number): the amount to add
+        :return: None
+        """
+        self._statistics[name] = self._statistics.get(name, 0) + value
+
+    def statistics(self):
+        """
+        Return the statistics recorded by the search algorithms
+        :return: dictionary mapping each statistic name to its value
+        """
+        return dict(self._statistics)
+
 
 def get_arguments():
     '''
     Parse and validate the command line arguments
-    :return: (tuple containing a file object and a string)
-            the maze file specified  and the search algoeithm specified
+    :return: (argparse.Namespace) the maze file, the search algorithm,
+            the heuristic and the options specified
     '''
     parser = argparse.ArgumentParser()
     parser.add_argument('maze_file',
                         help='name of the text file containing the maze info',
                         type=argparse.FileType('r')) # open the file
     parser.add_argument('search_algorithm',
-                        help='astar, dfs, bfs or ucs?',
-                        choices=['astar','dfs', 'bfs', 'ucs'])
+                        help=', '.join(INFORMED + UNINFORMED) + '?',
+                        choices=INFORMED + UNINFORMED)
     parser.add_argument('heuristic',
-                        help='A* heuristic',
+                        help='A* heuristic (bidirectional only expands '
+                             'fewer nodes than astar with null_heuristic)',
                         nargs='?',
                         default='null_heuristic')
+    parser.add_argument('-c', '--compact',
+                        help='represent each search state as a single int',
+                        action='store_true')
+    parser.add_argument('-T', '--no-transposition',
+                        help='search without the transposition table of '
+                             'idastar (only for state spaces with few '
+                             'transpositions)',
+                        dest='transposition',
+                        action='store_false')
+    parser.add_argument('-w', '--weight',
+                        help='heuristic weight of weighted_astar and '
+                             'initial weight of anytime_astar',
+                        type=float,
+                        default=None)
+    parser.add_argument('-b', '--time-budget',
+                        help='seconds after which the search stops (anytime_astar, '
+                             + ', '.join(STREAMING) + ')',
+                        type=float,
+                        default=None)
+    parser.add_argument('-n', '--no-display',
+                        help='do not visualize the solution',
+                        action='store_true')
+    parser.add_argument('-j', '--json',
+                        help='print the statistics as a JSON object',
+                        action='store_true')
+    parser.add_argument('-s', '--stats',
+                        help='report search statistics, sampling the '
+                             'state every N expansions if N is given',
+                        metavar='N',
+                        nargs='?',
+                        type=int,
+                        const=0,
+                        default=None)
+    parser.add_argument('-k', '--cache',
+                        help='cache the parsed maze in DIR (defaults to '
+                             + CACHE_DIR + ')',
+                        metavar='DIR',
+                        nargs='?',
+                        const=CACHE_DIR,
+                        default=None)
+    parser.add_argument('-m', '--memory',
+                        help='report the peak memory used by the search',
+                        action='store_true')
+    parser.add_argument('-l', '--live',
+                        help='show the search as it runs',
+                        action='store_true')
     arguments = parser.parse_args()
+    if arguments.stats is not None and \
+            arguments.search_algorithm not in INSTRUMENTED:
+        parser.error('--stats only works with ' + ', '.join(INSTRUMENTED))
+    if arguments.live and arguments.search_algorithm not in STREAMING:
+        parser.error('--live only works with ' + ', '.join(STREAMING))
+    if arguments.weight is not None and arguments.weight < 1:
+        parser.error('--weight must be at least 1')
+    if arguments.time_budget is not None and \
+            arguments.search_algorithm not in ['anytime_astar'] + STREAMING:
+        parser.error('--time-budget only works with anytime_astar, '
+                     + ', '.join(STREAMING))
+    if arguments.live and arguments.no_display:
+        parser.error('--live needs the display')
+    return arguments
+
+def run_search(quest, search, heuristic='null_heuristic', weight=None,
+               time_budget=None, transposition=True, progress=None,
+               stats=None):
+    """
+    Invoke the specified search algorithm on the quest
+    :param
+    quest (a Problem object) representing the quest
+    search (string): the name of the search algorithm
+    heuristic (string): the name of the heuristic function
+    weight (float): the heuristic weight of weighted_astar and the
+        initial weight of anytime_astar - defaults to their own default
+    time_budget (float): the number of seconds after which
+        anytime_astar returns its best solution and the STREAMING
+        algorithms return None - defaults to no limit
+    transposition (Boolean): False to run idastar without its
+        transposition table - defaults to True
+    progress (function): called with a message for each solution that
+        anytime_astar finds and when jps_astar runs astar instead -
+        defaults to no messages
+    stats (a SearchStats object): collects statistics about the search
+        if it is one of the INSTRUMENTED algorithms - defaults to None
+    :return: list of actions representing the solution to the quest
+                or None if there is no solution
+    """
+    if time_budget is not None and search in STREAMING:
+        events = search_events(quest, search, heuristic, stats)
+        solution, finished = search_kernel.follow(events,
+                                                  time_budget=time_budget)
+        if not finished and progress is not None:
+            progress(f'Stopped after {time_budget}(sec)')
+        return solution
+    options = {}
+    if stats is not None and search in INSTRUMENTED:
+        options['stats'] = stats
+    if search not in INFORMED:
+        search_function = getattr(uninformed_search, search)
+        return search_function(quest, **options)  # Invoke the search algorithm
+    heuristic_function = getattr(informed_search, heuristic)
+    search_function = getattr(informed_search, search)
+    if weight is not None and search in ('weighted_astar', 'anytime_astar'):
+        options['weight'] = weight
+    if search == 'idastar':
+        options['transposition'] = transposition
+    if search == 'jps_astar' and progress is not None and \
+            not informed_search.uniform_costs(quest):
+        progress('jps_astar needs moves that all cost the same: '
+                 'running astar instead')
+    if search != 'anytime_astar':
+        return search_function(quest, heuristic_function, **options)
+    start_time = time.perf_counter()
+    if time_budget is not None:
+        options['deadline'] = start_time + time_budget
+    solution = None
+    for solution, bound in search_function(quest, heuristic_function,
+                                           **options):
+        if progress is None:
+            continue
+        elapsed = f'after {time.perf_counter() - start_time:.4f}(sec)'
+        if solution is None:
+            progress(f'No solution yet {elapsed}')
+        elif bound is None:
+            progress(f'Carrots consumed: {quest.path_cost(solution)} '
+                     f'(no bound on the optimal yet) {elapsed}')
+        else:
+            progress(f'Carrots consumed: {quest.path_cost(solution)} '
+                     f'(at most {bound:.3f} times the optimal) {elapsed}')
+    return solution
+
+def precompute(quest, search, heuristic='null_heuristic'):
+    """
+    Compute the carrot distances to every medal ahead of the search if
+    the heuristic of the search looks them up, so their cost is not
+    part of the search time.
+    :param
+    quest (a Problem object) representing the quest
+    search (string): the name of the search algorithm
+    heuristic (string): the name of the heuristic function
+    :return: (float) the number of seconds spent, or None if the search
+        does not use the distances
+    """
+    if search not in INFORMED or search == 'medal_tour' or \
+            heuristic not in DISTANCE_HEURISTICS:
+        return None  # medal_tour computes its own distances
+    start_time = time.time()
+    quest.precompute_distances()
+    return time.time() - start_time
+
+def search_events(quest, search, heuristic='null_heuristic', stats=None):
+    """
+    Return the generator of expansion events of the specified search
+    algorithm on the quest (see search_kernel.best_first_events)
+    :param
+    quest (a Problem object) representing the quest
+    search (string): the name of one of the STREAMING algorithms
+    heuristic (string): the name of the heuristic function of astar
+    stats (a SearchStats object): collects statistics about the search
+        - defaults to None
+    :return: generator yielding an Expansion event for each state
+        expanded and returning the solution
+    """
+    if search == 'astar':
+        return informed_search.astar_events(
+            quest, getattr(informed_search, heuristic), stats)
+    return getattr(uninformed_search, search + '_events')(quest, stats)
+
+def print_stats(quest, report):
+    """
+    Print the report of a SearchStats object
+    :param
+    quest (a Problem object) representing the quest
+    report (dictionary): the statistics returned by SearchStats.report
+    :return: None
+    """
+    print('Search statistics:')
+    for name in ('pushes', 'pops', 'duplicates', 'expansions',
+                 'heuristic_calls', 'fringe_peak', 'closed_peak'):
+        print(f'    {name.replace("_", " ").capitalize()}: '
+              f'{report[name]:,}')
+    for name in ('expand_time', 'heuristic_time', 'search_time'):
+        print(f'    {name.replace("_", " ").capitalize()}: '
+              f'{report[name]:.4f}(sec)')
+    for sample in report['samples']:
+        position, medals = quest.decode_state(sample['state'])
+        print(f'    {sample["expansions"]:>10,} expansions '
+              f'{sample["time"]:>9.4f}(sec) fringe {sample["fringe"]:>8,}'
+              f'  Sammy at {position}, {len(medals)} medals left')
 
-    maze_file = arguments.maze_file
-    search = arguments.search_algorithm
-    heuristic = arguments.heuristic
-    return maze_file, search, heuristic
 
 def main():
-    maze_file, search, heuristic = get_arguments()
-    quest = Problem(maze_file)  # Initialize our search problem for this quest
+    arguments = get_arguments()
+    # Initialize our search problem for this quest
+    quest = Problem(arguments.maze_file, arguments.compact, arguments.cache)
+    precompute_time = precompute(quest, arguments.search_algorithm,
+                                 arguments.heuristic)
+    if arguments.memory:
+        tracemalloc.start()
+    stats = None
+    if arguments.stats is not None:
+        stats = data_structures.SearchStats(arguments.stats)
     start_time = time.time()
-    if search == "astar":
-        heuristic_function = getattr(informed_search, heuristic)
-        search_function = getattr(informed_search, search)
-        solution = search_function(quest, heuristic_function)
+    if arguments.live:
+        import graphics  # tkinter is only needed to visualize
+        events = search_events(quest, arguments.search_algorithm,
+                               arguments.heuristic, stats)
+        solution = graphics.Display(quest, None, events).solution
     else:
-        search_function = getattr(uninformed_search, search)
-        solution = search_function(quest)  # Invoke the search algorithm
+        solution = run_search(quest, arguments.search_algorithm,
+                              arguments.heuristic, arguments.weight,
+                              arguments.time_budget, arguments.transposition,
+                              None if arguments.json else print, stats)
     elapsed_time = time.time() - start_time
+    if arguments.memory:
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
 
     # Print some statistics
-    if solution is not None:
-        print('Path length: ', len(solution))
-        print('Carrots consumed: ', quest.path_cost(solution))
+    if arguments.json:
+        report = {'maze': arguments.maze_file.name,
+                  'algorithm': arguments.search_algorithm,
+                  'heuristic': arguments.heuristic,
+                  'solved': solution is not None,
+                  'path_length': None, 'carrots': None,
+                  'nodes_expanded': quest.nodes_expanded(),
+                  'processing_time': elapsed_time}
+        if solution is not None:
+            report['path_length'] = len(solution)
+            report['carrots'] = quest.path_cost(solution)
+        if arguments.memory:
+            report['peak_memory'] = peak_memory
+        if precompute_time is not None:
+            report['precompute_time'] = precompute_time
+        report.update(quest.statistics())
+        if stats is not None:
+            report['search'] = stats.report()
+            for sample in report['search']['samples']:
+                sample['state'] = quest.decode_state(sample['state'])
+        print(json.dumps(report))
     else:
-        print('The quest failed!')
-    print(f'Number of nodes expanded: {quest.nodes_expanded():,}')
-    print(f'Processing time: {elapsed_time:.4f}(sec)')
-
-    graphics.Display(quest, solution)  # Visualize the solution
-
+        if solution is not None:
+            print('Path length: ', len(solution))
+            print('Carrots consumed: ', quest.path_cost(solution))
+        else:
+            print('The quest failed!')
+        print(f'Number of nodes expanded: {quest.nodes_expanded():,}')
+        if arguments.memory:
+            print(f'Peak memory: {peak_memory / 1024:,.1f}(KiB)')
+        for name, value in quest.statistics().items():
+            print(f'{name.replace("_", " ").capitalize()}: {value:,}')
+        if precompute_time is not None:
+            print(f'Precomputation time: {precompute_time:.4f}(sec)')
+        print(f'Processing time: {elapsed_time:.4f}(sec)')
+        if stats is not None:
+            print_stats(quest, stats.report())
+
+    if not arguments.no_display and not arguments.live:
+        import graphics  # tkinter is only needed to visualize
+        graphics.Display(quest, solution)  # Visualize the solution
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -2,7 +2,7 @@
 # Name:     uninformed_search
 # Purpose:  Homework3 - Implement bfs and ucs graph search algorithms
 #
-# Author(s):
+# Author(s): Athena Nguyen & John Paul Tran
 #
 # ----------------------------------------------------------------------
 """
@@ -10,51 +10,124 @@ Uninformed Search Algorithm implementation
 
 dfs has been implemented for you.
 Your task for homework 3 is to implement bfs and ucs.
+bfs_events and ucs_events run bfs and ucs as generators of expansion
+events (see search_kernel.best_first_events).
 """
 import data_structures
+import search_kernel
 
-def dfs(problem):
+def dfs(problem, stats=None):
     """
     Depth first graph search algorithm - implemented for you
     :param problem (a Problem object) representing the quest
             see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
     :return: list of actions representing the solution to the quest
                 or None if there is no solution
     """
-    closed = set()  # keep track of our explored states
-    fringe = data_structures.Stack() # for dfs, the fringe is a stack
-    state = problem.start_state()
-    root = data_structures.Node(state, None, None)
-    fringe.push(root)
-    while not fringe.is_empty():
-        node = fringe.pop()
-        if problem.is_goal(node.state):
-            return node.solution()  # we found a solution
-        if node.state not in closed:  # we are implementing graph search
-            closed.add(node.state)
-            for child_state, action, action_cost in problem.expand(node.state):
-                child_node = data_structures.Node(child_state, node, action)
-                fringe.push(child_node)
-    return None  # Failure -  no solution was found
+    # for dfs, the fringe is a stack
+    return search_kernel.best_first_search(
+        problem, data_structures.Stack(), stats=stats)
 
-def bfs(problem):
+def bfs(problem, stats=None):
     """
     Breadth first graph search algorithm
     :param problem (a Problem object) representing the quest
             see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: list of actions representing the solution to the quest
+            or None if there is no solution
+    """
+    # for bfs, the fringe is a Queue
+    return search_kernel.best_first_search(
+        problem, data_structures.Queue(), stats=stats)
+
+def bfs_early(problem, stats=None):
+    """
+    Breadth first graph search algorithm with an early goal test.
+    The goal test is applied when a node is generated instead of when
+    it is popped, so the search stops before expanding the rest of the
+    layer that contains the goal.  States are marked as seen when they
+    are pushed, so the fringe holds each state at most once.
+    The solution has the same (optimal) path length as bfs.
+    :param problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
     :return: list of actions representing the solution to the quest
             or None if there is no solution
     """
-    # Enter your  code here and remove the pass statement below
-    pass
+    state = problem.start_state()
+    nodes = data_structures.NodeStore()  # the search tree
+    root = nodes.add(state, None, None)
+    if problem.is_goal(state):
+        return nodes.solution(root)
+    seen = {state}  # keep track of the states generated so far
+    fringe = data_structures.Queue()  # for bfs, the fringe is a Queue
+    expand = problem.expand
+    if stats is not None:
+        stats.watch(fringe, seen)
+        expand = stats.timed_expand(expand)
+    fringe.push(root)
+    try:
+        while not fringe.is_empty():
+            node = fringe.pop()
+            for child_state, action, action_cost in \
+                    expand(nodes.pop_state(node)):
+                if child_state not in seen:
+                    child_node = nodes.add(child_state, node, action)
+                    if problem.is_goal(child_state):
+                        return nodes.solution(child_node)  # a solution
+                    seen.add(child_state)
+                    fringe.push(child_node)
+    finally:
+        if stats is not None:
+            stats.finish()
+    return None  # Failure -  no solution was found
+
+def bfs_events(problem, stats=None):
+    """
+    Breadth first graph search algorithm as a generator
+    See search_kernel.best_first_events.
+    :param problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: generator yielding an Expansion event for each state
+            expanded and returning the solution (see bfs)
+    """
+    return search_kernel.best_first_events(
+        problem, data_structures.Queue(), stats=stats)
 
-def ucs(problem):
+def ucs(problem, stats=None):
     """
     Uniform cost first graph search algorithm
     :param
     problem (a Problem object) representing the quest
             see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
     :return: list of actions representing the solution to the quest
     """
-    # Enter your code here and remove the pass statement below
-    pass
+    # for ucs, the fringe is a PriorityQueue ordered by cumulative cost
+    return search_kernel.best_first_search(
+        problem, data_structures.PriorityQueue(),
+        search_kernel.cumulative_cost, stats)
+
+def ucs_events(problem, stats=None):
+    """
+    Uniform cost graph search algorithm as a generator
+    See search_kernel.best_first_events.
+    :param
+    problem (a Problem object) representing the quest
+            see Problem class definition in spartanquest.py)
+    stats (a SearchStats object) collects statistics about the search
+            - defaults to None (no statistics)
+    :return: generator yielding an Expansion event for each state
+            expanded and returning the solution (see ucs)
+    """
+    return search_kernel.best_first_events(
+        problem, data_structures.PriorityQueue(),
+        search_kernel.cumulative_cost, stats)
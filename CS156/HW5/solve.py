@@ -14,6 +14,10 @@ question corresponds to the question number in Homework 5 and the
 function name in the sudoku module: q1, q2 or q3
 puzzle_file is a text file such as easy.txt
 Example:  solve.py q1 veryeasy.txt
+
+Add the -g (--generic) option to solve the puzzle with the generic
+csp.CSP instead of the bitmask engine of sudoku_csp, for comparison.
+Example:  solve.py q3 hard.txt -g
 """
 
 import argparse
@@ -60,8 +64,9 @@ def write_solution(assignment):
 def get_arguments():
     '''
     Parse and validate the command line arguments
-    :return: (tuple containing a file object and a string)
-            the maze file specified  and the search algoeithm specified
+    :return: (tuple containing a string, a file object and a Boolean)
+            the question, the puzzle file and whether to use the
+            generic CSP
     '''
     parser = argparse.ArgumentParser()
     parser.add_argument('question',
@@ -70,19 +75,22 @@ def get_arguments():
     parser.add_argument('puzzle_file',
                         help='name of the text file containing the puzzle?',
                         type=argparse.FileType('r')) # open the file
+    parser.add_argument('-g', '--generic',
+                        help='use the generic CSP class',
+                        action='store_true')
 
     arguments = parser.parse_args()
 
     puzzle_file = arguments.puzzle_file
     question = arguments.question
-    return question, puzzle_file
+    return question, puzzle_file, arguments.generic
 
 def main():
-    question, puzzle_file = get_arguments()
+    question, puzzle_file, generic = get_arguments()
     puzzle = read_puzzle(puzzle_file)
     question_function =  getattr(sudoku, question)
     start_time = time.time()
-    solution, csp  = question_function(puzzle)
+    solution, csp  = question_function(puzzle, bitboard=not generic)
     elapsed_time = time.time() - start_time
     print('Processing time: {:.4f} (sec)'.format(elapsed_time))
     print (f'Nodes Expanded: {csp._nodes:,}')
@@ -11,8 +11,13 @@ Sudoku puzzle solver implementation
 q1:  Basic Backtracking Search
 q2:  Backtracking Search with AC-3
 q3:  Backtracking Search with MRV Ordering and AC-3
+
+The questions solve the puzzle with the bitmask engine of sudoku_csp
+unless bitboard=False is given, which uses the generic csp.CSP.  Both
+expand the same nodes.
 """
 import csp
+import sudoku_csp
 
 # Enter your helper functions here
 def get_neighbors(row, col):
@@ -115,48 +120,68 @@ def build_csp(puzzle):
     # Enter your code here and remove the pass statement below
     return csp.CSP(create_domains(puzzle), create_neighbors(puzzle), check_constraints)
 
-def q1(puzzle):
+def build_sudoku_csp(puzzle, bitboard=True):
+    """
+    Create the CSP object the questions solve the puzzle with.
+    :param puzzle (dictionary): The dictionary keys are tuples
+    (row, column) representing the filled puzzle squares and the values
+    are the corresponding numbers assigned to these squares.
+    :param bitboard (Boolean): True for a SudokuCSP, False for a
+    generic CSP - defaults to True
+    :return: SudokuCSP or CSP object
+    """
+    if bitboard:
+        return sudoku_csp.SudokuCSP(puzzle)
+    return build_csp(puzzle)
+
+def q1(puzzle, bitboard=True):
     """
     Solve the given puzzle with basic backtracking search
     :param puzzle (dictionary): The dictionary keys are tuples
     (row, column) representing the filled puzzle squares and the values
     are the corresponding numbers assigned to these squares.
+    :param bitboard (Boolean): True to use the SudokuCSP engine, False
+    for the generic CSP - defaults to True
     :return: a tuple consisting of a solution (dictionary) and the
     CSP object.
     """
     # Enter your code here and remove the pass statement below
-    csp = build_csp(puzzle)
+    csp = build_sudoku_csp(puzzle, bitboard)
     solution = csp.backtracking_search(), csp
     return solution
 
-def q2(puzzle):
+def q2(puzzle, bitboard=True):
     """
     Solve the given puzzle with backtracking search and AC-3 as
     a preprocessing step.
     :param puzzle (dictionary): The dictionary keys are tuples
     (row, column) representing the filled puzzle squares and the values
     are the corresponding numbers assigned to these squares.
+    :param bitboard (Boolean): True to use the SudokuCSP engine, False
+    for the generic CSP - defaults to True
     :return: a tuple consisting of a solution (dictionary) and the
     CSP object.
     """
     # Enter your code here and remove the pass statement below
-    csp = build_csp(puzzle)
+    csp = build_sudoku_csp(puzzle, bitboard)
     csp.ac3_algorithm()
     solution = csp.backtracking_search(), csp
     return solution
 
-def q3(puzzle):
+def q3(puzzle, bitboard=True):
     """
     Solve the given puzzle with backtracking search and MRV ordering and
     AC-3 as a preprocessing step.
     :param puzzle (dictionary): The dictionary keys are tuples
     (row, column) representing the filled puzzle squares and the values
     are the corresponding numbers assigned to these squares.
+    :param bitboard (Boolean): True to use the SudokuCSP engine, False
+    for the generic CSP - defaults to True
     :return: a tuple consisting of a solution (dictionary) and the
     CSP object.
     """
     # Enter your code here and remove the pass statement below
-    csp = build_csp(puzzle)
+    csp = build_sudoku_csp(puzzle, bitboard)
     csp.ac3_algorithm()
     solution = csp.backtracking_search("MRV"), csp
     return solution
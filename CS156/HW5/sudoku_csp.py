@@ -0,0 +1,182 @@
+# ----------------------------------------------------------------------
+# Name:     sudoku_csp
+# Purpose:  A CSP specialized for Sudoku, with bitmask domains
+#
+# Author(s): Athena Nguyen & John Paul Tran
+#
+# ----------------------------------------------------------------------
+"""
+Constraint Satisfaction Problem specialized for Sudoku
+
+csp.CSP works for any binary constraint: it keeps each domain in a set
+and calls the constraint function for every pair of values it checks.
+Sudoku only has the all-different constraint on rows, columns and 3x3
+boxes, so SudokuCSP keeps each domain as a 9-bit integer (bit v - 1 is
+set when the value v is in the domain) and the values already used in
+each row, column and box as bitmasks as well:
+    - a value is consistent with the assignment when its bit is in none
+      of the masks of the row, column and box of the variable
+    - the arc from tail to head removes the values of the head from the
+      tail when the head has one value left (with != as the constraint,
+      only such a value has no support)
+
+SudokuCSP has the interface of csp.CSP that the sudoku questions use
+(backtracking_search, ac3_algorithm, domains, neighbors and _nodes).
+It selects the variables with the same set operations and tries the
+values in the same (increasing) order, so both explore the same nodes
+in the same order and find the same solution.
+"""
+
+# The bit of each value 1 - 9 and the value of each single bit
+BITS = {value: 1 << (value - 1) for value in range(1, 10)}
+VALUES = {bit: value for value, bit in BITS.items()}
+ALL_VALUES = (1 << 9) - 1
+
+
+class SudokuCSP:
+
+    """
+    Represent a Sudoku puzzle as a Constraint Satisfaction Problem.
+    Arguments:
+    puzzle: a dictionary representing the filled squares.
+        The dictionary keys are tuples (row, column) and the values are
+        the numbers assigned to these squares.
+
+    Attributes:
+    variables: list of the (row, column) tuples, in row major order.
+    masks: list of the domain bitmask of each variable, indexed by
+        row * 9 + column.
+    neighbors: a dictionary mapping each variable to the set of the
+        variables in its row, column and box.
+    """
+
+    def __init__(self, puzzle):
+        self.variables = [(row, col) for row in range(9) for col in range(9)]
+        self.masks = [BITS[puzzle[variable]] if variable in puzzle
+                      else ALL_VALUES for variable in self.variables]
+        self.neighbors = {(row, col): self.get_neighbors(row, col)
+                          for row, col in self.variables}
+        self._nodes = 0
+
+    @staticmethod
+    def get_neighbors(row, col):
+        """
+        Return the variables that share a row, column or box with the
+        variable at the given position.
+        :param row: row index of the variable
+        :param col: column index of the variable
+        :return: set of (row, column) tuples
+        """
+        box_row, box_col = row - row % 3, col - col % 3
+        neighbors = {(row, each) for each in range(9)}
+        neighbors |= {(each, col) for each in range(9)}
+        neighbors |= {(box_row + row_offset, box_col + col_offset)
+                      for row_offset in range(3) for col_offset in range(3)}
+        neighbors.discard((row, col))
+        return neighbors
+
+    @property
+    def domains(self):
+        """
+        The domains as in csp.CSP: a dictionary mapping each variable to
+        the set of its values.
+        :return: dictionary of sets of values
+        """
+        return {variable: {value for value, bit in BITS.items() if mask & bit}
+                for variable, mask in zip(self.variables, self.masks)}
+
+    def backtracking_search(self, var_selection=None):
+        """
+        Implement the backtracking search algorithm
+        The search state is kept in local variables of a closure rather
+        than in attributes, since the search may visit millions of
+        nodes.
+        :param var_selection: (string) optional parameter to specify
+        variable ordering.
+        Specify "MRV" for Minimum Remaining Value Ordering.
+        :return:  complete consistent assignment or None if failure
+        """
+        mrv = var_selection == "MRV"
+        # the set of all the variables, built the way csp.CSP builds it
+        # so its iteration order (and the variables selected) match
+        all_variables = set(dict.fromkeys(self.variables))
+        remaining_values = {variable: bin(mask).count('1') for variable, mask
+                            in zip(self.variables, self.masks)}.__getitem__
+        assigned = set()
+        add, discard = assigned.add, assigned.discard
+        masks = self.masks
+        rows = [0] * 9  # the values used in each row
+        cols = [0] * 9  # the values used in each column
+        boxes = [0] * 9  # the values used in each box
+        assignment = {}
+        nodes = 0
+
+        def recursive_backtracking():
+            # True once every variable is assigned
+            nonlocal nodes
+            if len(assigned) == 81:
+                return True
+            # select a variable
+            remaining_vars = all_variables - assigned
+            if mrv:
+                var = min(remaining_vars, key=remaining_values)
+            else:
+                var = remaining_vars.pop()
+            nodes += 1
+            row, col = var
+            box = row - row % 3 + col // 3
+            # the values of the domain that no neighbor uses
+            candidates = masks[row * 9 + col] & \
+                ~(rows[row] | cols[col] | boxes[box])
+            while candidates:
+                bit = candidates & -candidates  # the lowest value first
+                candidates ^= bit
+                add(var)
+                rows[row] |= bit
+                cols[col] |= bit
+                boxes[box] |= bit
+                if recursive_backtracking():
+                    assignment[var] = VALUES[bit]
+                    return True
+                discard(var) # backtrack
+                rows[row] ^= bit
+                cols[col] ^= bit
+                boxes[box] ^= bit
+            return False
+
+        solved = recursive_backtracking()
+        self._nodes = nodes # Keep track of number of nodes
+        return assignment if solved else None
+
+    def ac3_algorithm(self):
+        """
+        Implement the AC-3 algorithm, reducing the variable domains.
+        :return: None
+        """
+        neighbors = [[row * 9 + col for row, col in self.neighbors[variable]]
+                     for variable in self.variables]
+        arcs = {(tail, head) for tail in range(81) for head in neighbors[tail]}
+        while arcs:
+            (tail, head) = arcs.pop()
+            if self.remove_inconsistent_values(tail, head):
+                for each_neighbor in neighbors[tail]:
+                    arcs.add((each_neighbor, tail))
+
+    def remove_inconsistent_values(self, tail, head):
+        """
+        Enforce the consistency of the arc from tail to head and remove
+        all inconsistent values from the domain of the tail.
+        :param tail: (int) the index row * 9 + column of a variable
+        :param head: (int) the index row * 9 + column of a variable
+        :return: True if one or more values are removed from the domain
+            False otherwise.
+        """
+        masks = self.masks
+        head_mask = masks[head]
+        if head_mask & (head_mask - 1):
+            return False  # every tail value differs from a head value
+        # the head value (or all values if the head domain is empty)
+        # has no support
+        removed = masks[tail] & (head_mask or ALL_VALUES)
+        masks[tail] ^= removed
+        return removed != 0